@@ -149,6 +149,7 @@ def screenshot():
         # Optional parameters for screenshot
         monitor = request.args.get('monitor', '0')  # Monitor index
         region = request.args.get('region')  # Format: "x,y,width,height"
+        image_format = request.args.get('format', 'png').lower()  # "png" or "jpeg"
         
         if region:
             # Capture specific region
@@ -158,13 +159,20 @@ def screenshot():
             # Capture entire screen
             screenshot = pyautogui.screenshot()
         
-        # Save to a bytes buffer
+        # Save to a bytes buffer; JPEG encodes far faster than PNG's deflate and is much smaller
         img_buffer = BytesIO()
-        screenshot.save(img_buffer, format='PNG')
+        if image_format in ('jpeg', 'jpg'):
+            quality = int(request.args.get('quality', 85))
+            # JPEG has no alpha channel, so RGBA/P captures must be converted first
+            screenshot.convert("RGB").save(img_buffer, format='JPEG', quality=quality)
+            mimetype = 'image/jpeg'
+        else:
+            screenshot.save(img_buffer, format='PNG')
+            mimetype = 'image/png'
         img_buffer.seek(0)
         
-        logger.info(f"Screenshot captured (monitor: {monitor}, region: {region})")
-        return send_file(img_buffer, mimetype='image/png')
+        logger.info(f"Screenshot captured (monitor: {monitor}, region: {region}, format: {mimetype})")
+        return send_file(img_buffer, mimetype=mimetype)
     except Exception as e:
         logger.error(f"Error capturing screenshot: {str(e)}")
         return jsonify({"status": "error", "error": str(e)}), 500
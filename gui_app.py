@@ -5,24 +5,77 @@ This provides a user-friendly interface for controlling the automation tool.
 
 import os
 import sys
+import atexit
+import math
 import time
 import threading
 import tkinter as tk
 from tkinter import ttk, scrolledtext, filedialog, messagebox
 import logging
+import logging.handlers
 import queue
 import yaml
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+# Maximum number of log records moved into the log pane per drain
+LOG_BATCH_SIZE = 200
+
+# Log pane polling interval in ms; it backs off from the minimum to the
+# maximum while no records arrive, and drops back when they do
+LOG_POLL_MIN_MS = 50
+LOG_POLL_MAX_MS = 1000
+
+# Maximum number of lines kept in the log pane; older lines are dropped
+MAX_LOG_LINES = 5000
+
+# Number of records buffered before log files are written; WARNING and above flush immediately
+FILE_LOG_BUFFER = 200
+
+# Minimum seconds between throttled status label updates from worker threads
+STATUS_MIN_INTERVAL = 0.2
+
+# Seconds to wait for a running automation to stop when the window is closed
+AUTOMATION_JOIN_TIMEOUT = 15
+
+# Modules imported by run_automation, loaded in the background at startup so the
+# first press of Start doesn't pay for them
+_PREWARM_MODULES = (
+    "requests",
+    "modules.network",
+    "modules.screenshot",
+    "modules.gemma_client",
+    "modules.qwen_client",
+    "modules.omniparser_client",
+    "modules.annotator",
+    "modules.simple_automation",
+    "modules.decision_engine",
+    "modules.game_launcher",
+)
+
+# Human-readable formatting of decision engine actions, keyed by action type
+_ACTION_FMT = {
+    "click": lambda a: f"Click at ({a.get('x')}, {a.get('y')})",
+    "key": lambda a: f"Press key {a.get('key')}",
+    "wait": lambda a: f"Wait for {a.get('duration')} seconds",
+}
 
 # Add logging handler for GUI
 class QueueHandler(logging.Handler):
-    """Send logging records to a queue"""
-    def __init__(self, log_queue):
+    """Send logging records to a queue, optionally notifying the consumer
+
+    notify runs inside emit() with the handler lock held, on whichever
+    thread logged, so it must not touch Tk.
+    """
+    def __init__(self, log_queue, notify=None):
         super().__init__()
         self.log_queue = log_queue
+        self.notify = notify
 
     def emit(self, record):
         self.log_queue.put(record)
+        if self.notify:
+            self.notify()
 
 class HybridConfigParser:
     """Handles loading and parsing both state machine and step-based YAML configurations."""
@@ -106,6 +159,12 @@ class HybridConfigParser:
         states = self.config.get("states", {})
         return states.get(state_name)
     
+    def all_state_definitions(self):
+        """Get all state definitions keyed by state name (state machine configs only)."""
+        if self.config_type != "state_machine":
+            return {}
+        return self.config.get("states", {})
+    
     def get_game_metadata(self):
         """Get game metadata from the configuration."""
         return self.config.get("metadata", {})
@@ -131,8 +190,12 @@ class AutomationGUI:
         self.game_name = "Unknown Game"  # Added for game-specific paths
         self.path_auto_loaded = False  # Track if path was loaded from config
         
-        # Queue for logging
-        self.log_queue = queue.Queue()
+        # Queue for logging; the main thread polls it, backing off while it stays empty.
+        # Handlers only set a flag, since a Tk call from a worker thread inside emit()
+        # would hold the handler lock while waiting on the main thread.
+        self.log_queue = queue.SimpleQueue()
+        self._new_logs = threading.Event()
+        self._log_poll_ms = LOG_POLL_MIN_MS
         self.setup_logger()
         
         # Create GUI elements
@@ -145,34 +208,85 @@ class AutomationGUI:
         self.style.configure("Red.TButton", background="red")
         
         # Start queue processing
-        self.root.after(100, self.process_log_queue)
+        self.root.after(LOG_POLL_MIN_MS, self.process_log_queue)
         
         # Save references to running objects
         self.automation_thread = None
         self.stop_event = threading.Event()
+        self._last_status_ts = 0.0
+        
+        # SUT connections are kept open between runs, keyed by (ip, port)
+        self._network_cache = {}
+        self._close_deadline = None  # Set once the window is closing and waiting for the run to stop
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # Import the automation modules once the window is up
+        self.root.after(0, self._prewarm_imports)
+
+    def _prewarm_imports(self):
+        """Import the automation modules on a daemon thread
+
+        run_automation keeps its local imports; once the modules are in
+        sys.modules those become cheap lookups.
+        """
+        def _import_all():
+            import importlib
+            for name in _PREWARM_MODULES:
+                try:
+                    importlib.import_module(name)
+                except Exception as e:
+                    # run_automation will report the real error if the module is needed
+                    self.logger.debug(f"Could not prewarm {name}: {str(e)}")
+
+        threading.Thread(target=_import_all, name="prewarm-imports", daemon=True).start()
+
+    def _ensure_dir(self, path):
+        """Create a directory (and its parents) unless it already exists
+
+        The check is made on disk every time, so a run or logs folder deleted
+        while the GUI is open is created again.
+
+        Args:
+            path: Directory path to create
+        """
+        if not os.path.isdir(path):
+            os.makedirs(path, exist_ok=True)
 
     def setup_logger(self):
         """Configure logging to both file and GUI"""
         self.logger = logging.getLogger()
         self.logger.setLevel(logging.INFO)
         
+        # None of the formatters use thread/process fields, so skip collecting them per record
+        logging.logThreads = False
+        logging.logProcesses = False
+        logging.logMultiprocessing = False
+        
         # Clear existing handlers
         for handler in self.logger.handlers[:]:
             self.logger.removeHandler(handler)
         
-        # File handler
-        os.makedirs("logs", exist_ok=True)
+        # File handler, driven by a listener thread so disk writes never block the UI or automation thread
+        self._ensure_dir("logs")
         file_handler = logging.FileHandler(f"logs/gui_run_{time.strftime('%Y_%m_%d__%H_%M_%S')}.log", encoding='utf-8')
         file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
         file_handler.setFormatter(file_formatter)
-        self.logger.addHandler(file_handler)
+        # Batch INFO/DEBUG writes; flushed on WARNING+, when full, and at exit
+        self.file_log_buffer = logging.handlers.MemoryHandler(FILE_LOG_BUFFER, flushLevel=logging.WARNING,
+                                                              target=file_handler)
+        atexit.register(self.file_log_buffer.flush)
+        self.log_queue_file = queue.SimpleQueue()
+        self.file_log_listener = logging.handlers.QueueListener(self.log_queue_file, self.file_log_buffer)
+        self.file_log_listener.start()
+        self.logger.addHandler(logging.handlers.QueueHandler(self.log_queue_file))
         
         # Queue handler for GUI
-        queue_handler = QueueHandler(self.log_queue)
+        queue_handler = QueueHandler(self.log_queue, notify=self._new_logs.set)
         # NEW - includes module names like command line
         queue_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s', 
                                    datefmt='%H:%M:%S')
         queue_handler.setFormatter(queue_formatter)
+        self._gui_formatter = queue_formatter
         self.logger.addHandler(queue_handler)
 
     def create_widgets(self):
@@ -447,26 +561,46 @@ class AutomationGUI:
         webbrowser.open("mailto:satyajit.bhuyan@intel.com")
 
     def process_log_queue(self):
-        """Process logs from the queue and display them in the GUI"""
+        """Process logs from the queue in bounded batches and display them in the GUI"""
+        self._new_logs.clear()
+        records = []
         try:
-            while True:
-                record = self.log_queue.get_nowait()
-                self.display_log(record)
+            while len(records) < LOG_BATCH_SIZE:
+                records.append(self.log_queue.get_nowait())
         except queue.Empty:
-            self.root.after(100, self.process_log_queue)
+            pass
+        
+        if records:
+            self.display_logs(records)
+        
+        # Come straight back if the batch was full; poll quickly while records
+        # are arriving and back off while the queue stays empty
+        if len(records) == LOG_BATCH_SIZE:
+            delay = 0
+        elif records or self._new_logs.is_set():
+            delay = self._log_poll_ms = LOG_POLL_MIN_MS
+        else:
+            delay = self._log_poll_ms = min(self._log_poll_ms * 2, LOG_POLL_MAX_MS)
+        self.root.after(delay, self.process_log_queue)
 
-    def display_log(self, record):
-        """Display a log record in the log area"""
-        msg = self.format_log_record(record)
+    def display_logs(self, records):
+        """Display a batch of log records in the log area with a single widget update"""
+        # Only follow the end of the log if the user hasn't scrolled up to read history
+        at_bottom = self.log_area.yview()[1] >= 0.999
         self.log_area.config(state=tk.NORMAL)
-        self.log_area.insert(tk.END, msg + "\n", record.levelname)
-        self.log_area.see(tk.END)  # Scroll to the end
+        for record in records:
+            self.log_area.insert(tk.END, self.format_log_record(record) + "\n", record.levelname)
+        # Trim the oldest lines so the widget doesn't grow without bound
+        lines = int(self.log_area.index('end-1c').split('.')[0])
+        if lines > MAX_LOG_LINES:
+            self.log_area.delete('1.0', f'{lines - MAX_LOG_LINES + 1}.0')
+        if at_bottom:
+            self.log_area.see(tk.END)  # Scroll to the end
         self.log_area.config(state=tk.DISABLED)
 
     def format_log_record(self, record):
         """Format a log record for display"""
-        formatter = self.logger.handlers[1].formatter
-        return formatter.format(record)
+        return self._gui_formatter.format(record)
 
     def update_vision_model_ui(self):
         """Update UI based on selected vision model"""
@@ -497,8 +631,8 @@ class AutomationGUI:
         )
         if filepath:
             self.config_path.set(filepath)
-            # Load game info when a new config is selected
-            self.load_game_info()
+            # Load game info once the dialog has been torn down
+            self.root.after_idle(self.load_game_info)
 
     def load_game_info(self):
         """Load and display game information from the selected config file"""
@@ -582,7 +716,7 @@ class AutomationGUI:
         else:
             # Find most recent run folder
             game_dir = f"logs/{self.game_name}" if self.game_name else "logs"
-            os.makedirs(game_dir, exist_ok=True)
+            self._ensure_dir(game_dir)
             
             run_folders = [f for f in os.listdir(game_dir) if f.startswith("run_")]
             if run_folders:
@@ -591,15 +725,32 @@ class AutomationGUI:
             else:
                 folder_path = os.path.abspath(game_dir)
         
-        # Platform-specific way to open folder
-        if sys.platform == 'win32':
-            os.startfile(folder_path)
-        elif sys.platform == 'darwin':  # macOS
-            import subprocess
-            subprocess.Popen(['open', folder_path])
-        else:  # Linux
-            import subprocess
-            subprocess.Popen(['xdg-open', folder_path])
+        self._open_with_system(folder_path)
+
+    def _open_with_system(self, path):
+        """Open a file or folder with the platform's default handler on a worker thread
+
+        os.startfile and the open/xdg-open launchers can stall on slow shells,
+        so they are kept off the Tk event loop.
+
+        Args:
+            path: Absolute path of the file or folder to open
+        """
+        def _launch():
+            try:
+                # Platform-specific way to open the path
+                if sys.platform == 'win32':
+                    os.startfile(path)
+                elif sys.platform == 'darwin':  # macOS
+                    import subprocess
+                    subprocess.Popen(['open', path])
+                else:  # Linux
+                    import subprocess
+                    subprocess.Popen(['xdg-open', path])
+            except Exception as e:
+                self.logger.error(f"Could not open {path}: {str(e)}")
+
+        threading.Thread(target=_launch, daemon=True).start()
 
     def open_latest_screenshot(self):
         """Open the latest annotated screenshot from the current or most recent run"""
@@ -615,24 +766,15 @@ class AutomationGUI:
             else:
                 screenshots_dir = os.path.abspath(f"{game_dir}/annotated")
         
-        os.makedirs(screenshots_dir, exist_ok=True)
+        self._ensure_dir(screenshots_dir)
         
         # Find the latest screenshot
         try:
-            files = [os.path.join(screenshots_dir, f) for f in os.listdir(screenshots_dir) 
-                    if f.startswith("annotated_") and f.endswith(".png")]
-            if files:
-                latest_file = max(files, key=os.path.getmtime)
-                
-                # Platform-specific way to open image
-                if sys.platform == 'win32':
-                    os.startfile(latest_file)
-                elif sys.platform == 'darwin':  # macOS
-                    import subprocess
-                    subprocess.Popen(['open', latest_file])
-                else:  # Linux
-                    import subprocess
-                    subprocess.Popen(['xdg-open', latest_file])
+            with os.scandir(screenshots_dir) as it:
+                entries = [e for e in it if e.name.startswith("annotated_") and e.name.endswith(".png")]
+            if entries:
+                latest_file = max(entries, key=lambda e: e.stat().st_mtime).path
+                self._open_with_system(latest_file)
             else:
                 messagebox.showinfo("No Screenshots", "No annotated screenshots found.")
         except Exception as e:
@@ -650,7 +792,8 @@ class AutomationGUI:
             messagebox.showerror("Invalid Input", str(e))
             return
         
-        if not self.sut_ip.get():
+        sut_ip = self.sut_ip.get()
+        if not sut_ip:
             messagebox.showerror("Invalid Input", "SUT IP address is required")
             return
             
@@ -662,12 +805,25 @@ class AutomationGUI:
             if not response:
                 return
             
-        if not self.config_path.get() or not os.path.exists(self.config_path.get()):
+        config_path = self.config_path.get()
+        if not config_path or not os.path.exists(config_path):
             messagebox.showerror("Invalid Input", "Config file does not exist")
             return
             
         # Load game info to ensure we have the game name
         self.load_game_info()
+        
+        # Snapshot the settings on the UI thread so the worker never reads Tk variables
+        settings = {
+            'sut_ip': sut_ip,
+            'sut_port': port,
+            'game_path': self.game_path.get(),  # May have been auto-populated by load_game_info
+            'config_path': config_path,
+            'max_iterations': iterations,
+            'vision_model': self.vision_model.get(),
+            'lm_studio_url': self.lm_studio_url.get(),
+            'omniparser_url': self.omniparser_url.get(),
+        }
             
         # Clear stop event and update GUI state
         self.stop_event.clear()
@@ -679,6 +835,7 @@ class AutomationGUI:
         # Start automation in a separate thread
         self.automation_thread = threading.Thread(
             target=self.run_automation,
+            args=(settings,),
             daemon=True
         )
         self.automation_thread.start()
@@ -696,25 +853,87 @@ class AutomationGUI:
             self.stop_button.config(state=tk.DISABLED)
             self.status_label.config(text="Stopped", foreground="red")
 
-    def run_automation(self):
+    def _set_status(self, text, foreground=None, throttle=False):
+        """Update the status label from any thread by marshalling onto the Tk event loop
+
+        Args:
+            text: Status text to display
+            foreground: Optional text colour
+            throttle: Drop the update if the previous one was less than
+                STATUS_MIN_INTERVAL seconds ago (for frequent progress updates)
+        """
+        now = time.monotonic()
+        if throttle and now - self._last_status_ts < STATUS_MIN_INTERVAL:
+            return
+        self._last_status_ts = now
+        if foreground:
+            self.root.after_idle(lambda: self.status_label.config(text=text, foreground=foreground))
+        else:
+            self.root.after_idle(lambda: self.status_label.config(text=text))
+
+    def _log_run_error(self, message, exc):
+        """Log an automation failure, with a traceback unless the run was being stopped
+
+        Args:
+            message: Description of what failed
+            exc: The exception being handled
+        """
+        if self.stop_event.is_set():
+            # Errors while stopping are usually the SUT or game going away; the message is enough
+            self.logger.error("%s: %s", message, exc)
+        else:
+            self.logger.exception("%s: %s", message, exc)
+
+    def _get_network(self, network_cls, sut_ip, sut_port):
+        """Return the cached SUT connection for (ip, port); a stale one reconnects on first use"""
+        key = (sut_ip, sut_port)
+        network = self._network_cache.get(key)
+        if network is not None:
+            self.logger.info(f"Reusing connection to SUT at {sut_ip}:{sut_port}")
+            network.mark_reused()
+            return network
+        self.logger.info(f"Connecting to SUT at {sut_ip}:{sut_port}")
+        network = self._network_cache[key] = network_cls(sut_ip, sut_port)
+        return network
+
+    def on_close(self):
+        """Stop any running automation, close cached SUT connections and exit"""
+        self.stop_event.set()
+        # Let the run finish its cleanup before its connection is closed underneath it.
+        # Poll instead of blocking in join(), since the worker's own Tk calls need the event loop.
+        if self.automation_thread and self.automation_thread.is_alive():
+            if self._close_deadline is None:
+                self._close_deadline = time.monotonic() + AUTOMATION_JOIN_TIMEOUT
+            if time.monotonic() < self._close_deadline:
+                self.root.after(100, self.on_close)
+                return
+            self.logger.warning("Automation did not stop in time; closing anyway")
+        for network in self._network_cache.values():
+            network.close()
+        self._network_cache.clear()
+        self.file_log_listener.stop()
+        self.file_log_buffer.close()
+        self.root.destroy()
+
+    def run_automation(self, settings):
         """Run the main automation process with automatic config type detection"""
         try:
             # Parse configuration with hybrid parser
-            config_parser = HybridConfigParser(self.config_path.get())
+            config_parser = HybridConfigParser(settings['config_path'])
             config = config_parser.get_config()
             
             if config_parser.is_step_based():
                 # Use SimpleAutomation for step-based configs
                 self.logger.info("Using SimpleAutomation for step-based configuration")
-                self._run_simple_automation(config_parser, config)
+                self._run_simple_automation(config_parser, config, settings)
             else:
                 # Use state machine automation
                 self.logger.info("Using state machine automation")
-                self._run_state_machine_automation(config_parser, config)
+                self._run_state_machine_automation(config_parser, config, settings)
                 
         except Exception as e:
-            self.logger.error(f"Error in automation process: {str(e)}", exc_info=True)
-            self.status_label.config(text="Error", foreground="red")
+            self._log_run_error("Error in automation process", e)
+            self._set_status("Error", "red")
         finally:
             self.logger.info("Cleaning up resources")
             # Reset GUI state
@@ -723,7 +942,7 @@ class AutomationGUI:
             self.root.after(0, lambda: self.stop_button.config(state=tk.DISABLED))
             self.logger.info("Automation process completed")
 
-    def _run_simple_automation(self, config_parser, config):
+    def _run_simple_automation(self, config_parser, config, settings):
         """Run automation using SimpleAutomation system."""
         try:
             # Import required modules
@@ -740,92 +959,100 @@ class AutomationGUI:
             # Create timestamp for this run
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
 
-            # Create game-specific directory structure
-            os.makedirs("logs", exist_ok=True)
+            # Create the run-specific directory structure (makedirs creates the game and logs parents)
             game_dir = f"logs/{self.game_name}" if self.game_name else "logs"
-            os.makedirs(game_dir, exist_ok=True)
-
-            # Create run-specific directory
             run_dir = f"{game_dir}/run_{timestamp}"
-            os.makedirs(run_dir, exist_ok=True)
-            os.makedirs(f"{run_dir}/screenshots", exist_ok=True)
-            os.makedirs(f"{run_dir}/annotated", exist_ok=True)
+            self._ensure_dir(f"{run_dir}/screenshots")
+            self._ensure_dir(f"{run_dir}/annotated")
             
             # Store the current run directory for later use
             self.current_run_dir = run_dir
             
             # Set up run-specific logging
             run_log_file = f"{run_dir}/automation.log"
-            run_file_handler = logging.FileHandler(run_log_file)
+            run_file_handler = logging.FileHandler(run_log_file, delay=True)
             run_file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
             run_file_handler.setFormatter(run_file_formatter)
-            logging.getLogger().addHandler(run_file_handler)
+            # Hand records to a listener thread so file writes stay off the automation thread
+            run_log_buffer = logging.handlers.MemoryHandler(FILE_LOG_BUFFER, flushLevel=logging.WARNING,
+                                                            target=run_file_handler)
+            run_log_queue = queue.SimpleQueue()
+            run_log_handler = logging.handlers.QueueHandler(run_log_queue)
+            run_log_listener = logging.handlers.QueueListener(run_log_queue, run_log_buffer, respect_handler_level=True)
+            run_log_listener.start()
+            logging.getLogger().addHandler(run_log_handler)
+            
+            self.logger.info("Created run directory: %s", run_dir)
+            self.logger.info("Logs will be saved to: %s", run_log_file)
             
-            self.logger.info(f"Created run directory: {run_dir}")
-            self.logger.info(f"Logs will be saved to: {run_log_file}")
+            sut_ip = settings['sut_ip']
+            sut_port = settings['sut_port']
+            game_path = settings['game_path']
             
             # Initialize components
-            self.logger.info(f"Connecting to SUT at {self.sut_ip.get()}:{self.sut_port.get()}")
-            network = NetworkManager(self.sut_ip.get(), int(self.sut_port.get()))
+            network = self._get_network(NetworkManager, sut_ip, sut_port)
             
             self.logger.info("Initializing components...")
-            screenshot_mgr = ScreenshotManager(network)
+            screenshot_mgr = ScreenshotManager(network, image_format=config.get("metadata", {}).get("screenshot_format", "png"))
             
             # Initialize the vision model based on user selection
-            if self.vision_model.get() == 'gemma':
+            if settings['vision_model'] == 'gemma':
                 self.logger.info("Using Gemma for UI detection")
-                vision_model = GemmaClient(self.lm_studio_url.get())
-            elif self.vision_model.get() == 'qwen':
+                vision_model = GemmaClient(settings['lm_studio_url'])
+            elif settings['vision_model'] == 'qwen':
                 self.logger.info("Using Qwen VL for UI detection")
-                vision_model = QwenClient(self.lm_studio_url.get())
-            elif self.vision_model.get() == 'omniparser':
+                vision_model = QwenClient(settings['lm_studio_url'])
+            elif settings['vision_model'] == 'omniparser':
                 self.logger.info("Using Omniparser for UI detection")
-                vision_model = OmniparserClient(self.omniparser_url.get())
+                vision_model = OmniparserClient(settings['omniparser_url'])
                 
             annotator = Annotator()
             game_launcher = GameLauncher(network)
             
             # Get game metadata
             game_metadata = config_parser.get_game_metadata()
-            self.logger.info(f"Game metadata loaded: {game_metadata}")
+            self.logger.info("Game metadata loaded: %s", game_metadata)
             startup_wait = game_metadata.get("startup_wait", 30)
             
             try:
                 # Launch the game only if a path is provided
-                if self.game_path.get():
-                    self.logger.info(f"Launching game from: {self.game_path.get()}")
-                    game_launcher.launch(self.game_path.get())
+                if game_path:
+                    self.logger.info("Launching game from: %s", game_path)
+                    game_launcher.launch(game_path)
                     
                     # Wait for game to initialize
-                    self.logger.info(f"Waiting {startup_wait} seconds for game to fully initialize...")
-                    wait_time = startup_wait
-                    for i in range(wait_time):
-                        if self.stop_event.is_set():
+                    self.logger.info("Waiting %s seconds for game to fully initialize...", startup_wait)
+                    deadline = time.monotonic() + startup_wait
+                    while True:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._set_status(f"Initializing ({math.ceil(remaining)}s)", throttle=True)
+                        if self.stop_event.wait(min(1.0, remaining)):
                             break
-                        time.sleep(1)
-                        self.status_label.config(text=f"Initializing ({wait_time-i}s)")
                 else:
                     self.logger.info("No game path provided, assuming game is already running")
-                    self.status_label.config(text="Running (no launch)")
+                    self._set_status("Running (no launch)")
                 
                 if self.stop_event.is_set():
                     self.logger.info("Automation stopped during initialization")
                     return
                     
-                self.status_label.config(text="Running", foreground="green")
+                self._set_status("Running", "green")
                 
                 # Use SimpleAutomation
                 self.logger.info("Starting SimpleAutomation...")
                 
                 # Configure simple automation with run-specific directory
                 simple_auto = SimpleAutomation(
-                    config_path=self.config_path.get(),
+                    config_path=settings['config_path'],
                     network=network,
                     screenshot_mgr=screenshot_mgr,
                     vision_model=vision_model,
                     stop_event=self.stop_event,
                     run_dir=run_dir,
-                    annotator=annotator
+                    annotator=annotator,
+                    config=config
                 )
                 
                 # Run the simple automation
@@ -833,30 +1060,31 @@ class AutomationGUI:
                 
                 # Update UI based on result
                 if success:
-                    self.status_label.config(text="Completed", foreground="green")
+                    self._set_status("Completed", "green")
                 elif self.stop_event.is_set():
-                    self.status_label.config(text="Stopped", foreground="red")
+                    self._set_status("Stopped", "red")
                 else:
-                    self.status_label.config(text="Failed", foreground="red")
+                    self._set_status("Failed", "red")
                     
             except Exception as e:
-                self.logger.error(f"Error in simple automation execution: {str(e)}", exc_info=True)
-                self.status_label.config(text="Error", foreground="red")
+                self._log_run_error("Error in simple automation execution", e)
+                self._set_status("Error", "red")
                 
             finally:
-                # Cleanup
-                if 'network' in locals():
-                    network.close()
+                # Cleanup (the SUT connection stays open for the next run)
                 if 'vision_model' in locals() and hasattr(vision_model, 'close'):
                     vision_model.close()
-                # Remove the run-specific log handler
-                if 'run_file_handler' in locals():
-                    logging.getLogger().removeHandler(run_file_handler)
+                # Remove the run-specific log handler and drain the listener
+                if 'run_log_handler' in locals():
+                    logging.getLogger().removeHandler(run_log_handler)
+                    run_log_listener.stop()
+                    run_log_buffer.close()  # Flushes any buffered records
+                    run_file_handler.close()
                     
         except Exception as e:
-            self.logger.error(f"SimpleAutomation failed: {str(e)}", exc_info=True)
+            self._log_run_error("SimpleAutomation failed", e)
 
-    def _run_state_machine_automation(self, config_parser, config):
+    def _run_state_machine_automation(self, config_parser, config, settings):
         """Run automation using original state machine approach."""
         try:
             # Import required modules
@@ -873,47 +1101,52 @@ class AutomationGUI:
             # Create timestamp for this run
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
 
-            # Create game-specific directory structure
-            os.makedirs("logs", exist_ok=True)
+            # Create the run-specific directory structure (makedirs creates the game and logs parents)
             game_dir = f"logs/{self.game_name}" if self.game_name else "logs"
-            os.makedirs(game_dir, exist_ok=True)
-
-            # Create run-specific directory
             run_dir = f"{game_dir}/run_{timestamp}"
-            os.makedirs(run_dir, exist_ok=True)
-            os.makedirs(f"{run_dir}/screenshots", exist_ok=True)
-            os.makedirs(f"{run_dir}/annotated", exist_ok=True)
+            self._ensure_dir(f"{run_dir}/screenshots")
+            self._ensure_dir(f"{run_dir}/annotated")
             
             # Store the current run directory for later use
             self.current_run_dir = run_dir
             
             # Set up run-specific logging
             run_log_file = f"{run_dir}/automation.log"
-            run_file_handler = logging.FileHandler(run_log_file)
+            run_file_handler = logging.FileHandler(run_log_file, delay=True)
             run_file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
             run_file_handler.setFormatter(run_file_formatter)
-            logging.getLogger().addHandler(run_file_handler)
+            # Hand records to a listener thread so file writes stay off the automation thread
+            run_log_buffer = logging.handlers.MemoryHandler(FILE_LOG_BUFFER, flushLevel=logging.WARNING,
+                                                            target=run_file_handler)
+            run_log_queue = queue.SimpleQueue()
+            run_log_handler = logging.handlers.QueueHandler(run_log_queue)
+            run_log_listener = logging.handlers.QueueListener(run_log_queue, run_log_buffer, respect_handler_level=True)
+            run_log_listener.start()
+            logging.getLogger().addHandler(run_log_handler)
             
-            self.logger.info(f"Created run directory: {run_dir}")
-            self.logger.info(f"Logs will be saved to: {run_log_file}")
+            self.logger.info("Created run directory: %s", run_dir)
+            self.logger.info("Logs will be saved to: %s", run_log_file)
+            
+            sut_ip = settings['sut_ip']
+            sut_port = settings['sut_port']
+            game_path = settings['game_path']
             
             # Initialize components
-            self.logger.info(f"Connecting to SUT at {self.sut_ip.get()}:{self.sut_port.get()}")
-            network = NetworkManager(self.sut_ip.get(), int(self.sut_port.get()))
+            network = self._get_network(NetworkManager, sut_ip, sut_port)
             
             self.logger.info("Initializing components...")
-            screenshot_mgr = ScreenshotManager(network)
+            screenshot_mgr = ScreenshotManager(network, image_format=config.get("metadata", {}).get("screenshot_format", "png"))
             
             # Initialize the vision model based on user selection
-            if self.vision_model.get() == 'gemma':
+            if settings['vision_model'] == 'gemma':
                 self.logger.info("Using Gemma for UI detection")
-                vision_model = GemmaClient(self.lm_studio_url.get())
-            elif self.vision_model.get() == 'qwen':
+                vision_model = GemmaClient(settings['lm_studio_url'])
+            elif settings['vision_model'] == 'qwen':
                 self.logger.info("Using Qwen VL for UI detection")
-                vision_model = QwenClient(self.lm_studio_url.get())
-            elif self.vision_model.get() == 'omniparser':
+                vision_model = QwenClient(settings['lm_studio_url'])
+            elif settings['vision_model'] == 'omniparser':
                 self.logger.info("Using Omniparser for UI detection")
-                vision_model = OmniparserClient(self.omniparser_url.get())
+                vision_model = OmniparserClient(settings['omniparser_url'])
                 
             annotator = Annotator()
             decision_engine = DecisionEngine(config)
@@ -921,32 +1154,34 @@ class AutomationGUI:
             
             # Get game metadata
             game_metadata = config_parser.get_game_metadata()
-            self.logger.info(f"Game metadata loaded: {game_metadata}")
+            self.logger.info("Game metadata loaded: %s", game_metadata)
             startup_wait = game_metadata.get("startup_wait", 30)
             
             try:
                 # Launch the game only if a path is provided
-                if self.game_path.get():
-                    self.logger.info(f"Launching game from: {self.game_path.get()}")
-                    game_launcher.launch(self.game_path.get())
+                if game_path:
+                    self.logger.info("Launching game from: %s", game_path)
+                    game_launcher.launch(game_path)
                     
                     # Wait for game to initialize
-                    self.logger.info(f"Waiting {startup_wait} seconds for game to fully initialize...")
-                    wait_time = startup_wait
-                    for i in range(wait_time):
-                        if self.stop_event.is_set():
+                    self.logger.info("Waiting %s seconds for game to fully initialize...", startup_wait)
+                    deadline = time.monotonic() + startup_wait
+                    while True:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._set_status(f"Initializing ({math.ceil(remaining)}s)", throttle=True)
+                        if self.stop_event.wait(min(1.0, remaining)):
                             break
-                        time.sleep(1)
-                        self.status_label.config(text=f"Initializing ({wait_time-i}s)")
                 else:
                     self.logger.info("No game path provided, assuming game is already running")
-                    self.status_label.config(text="Running (no launch)")
+                    self._set_status("Running (no launch)")
                 
                 if self.stop_event.is_set():
                     self.logger.info("Automation stopped during initialization")
                     return
                     
-                self.status_label.config(text="Running", foreground="green")
+                self._set_status("Running", "green")
                 
                 # Main execution loop - state machine approach
                 iteration = 0
@@ -954,141 +1189,179 @@ class AutomationGUI:
                 target_state = decision_engine.get_target_state()
                 
                 # Track time spent in each state to detect timeouts
-                state_start_time = time.time()
+                state_start_time = time.monotonic()
                 max_time_in_state = 60  # Default maximum seconds to remain in the same state
+                max_iter = settings['max_iterations']
+                
+                # Resolve config lookups once; the config does not change during the run
+                state_defs = config_parser.all_state_definitions()
+                transitions = config.get("transitions", {})
+                screenshot_prefix = f"{run_dir}/screenshots/screenshot_"
+                annotated_prefix = f"{run_dir}/annotated/annotated_"
+                
+                # Saving and annotating screenshots is only needed for the logs, so it runs
+                # alongside the decision, action and transition delay instead of in front of them
+                background_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="run-io")
+                background_futures = []
                 
-                while current_state != target_state and iteration < int(self.max_iterations.get()) and not self.stop_event.is_set():
+                # Bind the per-iteration calls once instead of resolving them every iteration
+                capture = screenshot_mgr.capture_bytes
+                save = screenshot_mgr.save
+                detect = vision_model.detect_ui_elements
+                draw = annotator.draw_bounding_boxes
+                decide = decision_engine.determine_next_action
+                send = network.send_action
+                submit = background_pool.submit
+                
+                # Stop requests are checked at the top of each iteration and after the slow vision call;
+                # every other wait in the loop is a stop_event.wait that returns as soon as it is set
+                stopped = self.stop_event.is_set
+                while current_state != target_state and iteration < max_iter and not stopped():
                     iteration += 1
-                    self.logger.info(f"Iteration {iteration}: Current state: {current_state}")
                     
                     # Get state-specific timeout
-                    state_def = config_parser.get_state_definition(current_state)
+                    state_def = state_defs.get(current_state)
                     state_timeout = state_def.get("timeout", max_time_in_state) if state_def else max_time_in_state
                     
                     # Check for timeout in current state
-                    time_in_state = time.time() - state_start_time
+                    now = time.monotonic()
+                    time_in_state = now - state_start_time
                     if time_in_state > state_timeout:
-                        self.logger.warning(f"Timeout in state {current_state} after {time_in_state:.1f} seconds (limit: {state_timeout}s)")
+                        self.logger.warning("Timeout in state %s after %.1f seconds (limit: %ss)", current_state, time_in_state, state_timeout)
                         
                         # Get fallback action
                         fallback_action = decision_engine.get_fallback_action(current_state)
-                        self.logger.info(f"Using fallback action for timeout: {fallback_action}")
+                        self.logger.info("Using fallback action for timeout: %s", fallback_action)
                         
                         # Execute fallback action
-                        network.send_action(fallback_action)
+                        send(fallback_action)
                         self.logger.info("Executed timeout recovery action")
-                        time.sleep(2)
+                        if self.stop_event.wait(2):
+                            break
                         
                         # Reset timeout timer
-                        state_start_time = time.time()
+                        state_start_time = time.monotonic()
                         continue
                     
-                    # Capture screenshot - USE RUN-SPECIFIC DIRECTORY
-                    screenshot_path = f"{run_dir}/screenshots/screenshot_{iteration}.png"
-                    screenshot_mgr.capture(screenshot_path)
-                    self.logger.info(f"Screenshot captured: {screenshot_path}")
+                    # Collect the previous iteration's background work first so failures still surface
+                    for future in background_futures:
+                        future.result()
+                    
+                    # Capture screenshot into memory and save it to the RUN-SPECIFIC DIRECTORY in the background
+                    screenshot_path = screenshot_prefix + str(iteration) + screenshot_mgr.file_extension
+                    screenshot_data = capture()
+                    background_futures = [submit(save, screenshot_path, screenshot_data)]
                     
                     # Process with vision model
-                    bounding_boxes = vision_model.detect_ui_elements(screenshot_path)
-                    self.logger.info(f"Detected {len(bounding_boxes)} UI elements")
+                    bounding_boxes = detect(screenshot_path, image_data=screenshot_data)
+                    if stopped():
+                        break
                     
                     # Annotate screenshot - USE RUN-SPECIFIC DIRECTORY
-                    annotated_path = f"{run_dir}/annotated/annotated_{iteration}.png"
-                    annotator.draw_bounding_boxes(screenshot_path, bounding_boxes, annotated_path)
-                    self.logger.info(f"Annotated screenshot saved: {annotated_path}")
+                    annotated_path = annotated_prefix + str(iteration) + ".png"
+                    background_futures.append(submit(
+                        draw, screenshot_path, bounding_boxes, annotated_path, screenshot_data
+                    ))
                     
                     # Determine next action
                     previous_state = current_state
-                    next_action, new_state = decision_engine.determine_next_action(
-                        current_state, bounding_boxes
-                    )
+                    next_action, new_state = decide(current_state, bounding_boxes)
                     
-                    # Format the action for better logging
+                    # Format the action for better logging, skipped entirely when INFO is suppressed
+                    action_type = next_action.get("type") if next_action else None
+                    log_info = self.logger.isEnabledFor(logging.INFO)
                     action_str = ""
-                    if next_action:
-                        if next_action.get("type") == "click":
-                            action_str = f"Click at ({next_action.get('x')}, {next_action.get('y')})"
-                        elif next_action.get("type") == "key":
-                            action_str = f"Press key {next_action.get('key')}"
-                        elif next_action.get("type") == "wait":
-                            action_str = f"Wait for {next_action.get('duration')} seconds"
-                        else:
-                            action_str = str(next_action)
+                    if next_action and log_info:
+                        action_str = _ACTION_FMT.get(action_type, str)(next_action)
                             
-                    self.logger.info(f"Next action: {action_str}, transitioning to state: {new_state}")
+                    # One summary record per iteration instead of several separate ones
+                    if log_info:
+                        self.logger.info("Iteration %d: state: %s, detected %d UI elements, next action: %s, next state: %s",
+                                         iteration, current_state, len(bounding_boxes), action_str, new_state)
                     
                     # Execute action
-                    if next_action and not self.stop_event.is_set():
-                        self.logger.info(f"Executing action: {action_str}")
-                        
+                    if next_action:
                         # Handle "wait" actions locally instead of sending to SUT
-                        if next_action.get("type") == "wait":
+                        if action_type == "wait":
                             duration = next_action.get("duration", 1)
-                            self.logger.info(f"Waiting for {duration} seconds...")
                             
-                            # Wait in small increments so we can check for stop events
-                            for i in range(duration):
-                                if self.stop_event.is_set():
+                            # Wait in chunks of up to 10 seconds so long waits log progress from this
+                            # thread; each chunk returns as soon as stop is requested
+                            deadline = time.monotonic() + duration
+                            while True:
+                                remaining = deadline - time.monotonic()
+                                if remaining <= 0:
+                                    break
+                                if self.stop_event.wait(min(10, remaining)):
                                     self.logger.info("Wait interrupted by stop event")
                                     break
-                                time.sleep(1)
-                                if i % 10 == 0 and i > 0:  # Log every 10 seconds for long waits
-                                    self.logger.info(f"Still waiting... {i}/{duration} seconds elapsed")
+                                if time.monotonic() < deadline:
+                                    self.logger.info("Still waiting... %d/%s seconds elapsed",
+                                                     duration - (deadline - time.monotonic()), duration)
                                     
-                            self.logger.info(f"Wait completed")
+                            self.logger.debug("Wait completed")
                         else:
                             # Send other action types to SUT
-                            network.send_action(next_action)
+                            send(next_action)
                             
-                        self.logger.info(f"Action completed: {action_str}")
+                        self.logger.debug("Action completed: %s", action_str)
                     
                     # Update state
                     current_state = new_state
                     if previous_state != current_state:
                         # Reset timeout timer when state changes
-                        state_start_time = time.time()
-                        self.logger.info(f"State changed from {previous_state} to {current_state}")
+                        state_start_time = time.monotonic()
+                        self.logger.info("State changed from %s to %s", previous_state, current_state)
                     
                     # Get delay from transition if specified
-                    transition_key = f"{previous_state}->{current_state}"
-                    transition = config.get("transitions", {}).get(transition_key, {})
+                    transition = transitions.get(previous_state + "->" + current_state, {})
                     delay = transition.get("expected_delay", 1)
                     
-                    time.sleep(delay)  # Wait before next iteration
+                    if self.stop_event.wait(delay):  # Wait before next iteration, waking immediately on stop
+                        break
                 
                 # Check if we reached the target state
                 if current_state == target_state:
-                    self.logger.info(f"Successfully reached target state: {target_state}")
+                    self.logger.info("Successfully reached target state: %s", target_state)
                     
                     # Report benchmark results if available
                     if hasattr(decision_engine, "state_context") and "benchmark_duration" in decision_engine.state_context:
                         benchmark_duration = decision_engine.state_context["benchmark_duration"]
-                        self.logger.info(f"Benchmark completed in {benchmark_duration:.2f} seconds")
+                        self.logger.info("Benchmark completed in %.2f seconds", benchmark_duration)
                         
-                    self.status_label.config(text="Completed", foreground="green")
+                    self._set_status("Completed", "green")
                 elif self.stop_event.is_set():
                     self.logger.info("Automation process was manually stopped")
-                    self.status_label.config(text="Stopped", foreground="red")
+                    self._set_status("Stopped", "red")
                 else:
-                    self.logger.warning(f"Failed to reach target state. Stopped at: {current_state}")
-                    self.status_label.config(text="Failed", foreground="red")
+                    self.logger.warning("Failed to reach target state. Stopped at: %s", current_state)
+                    self._set_status("Failed", "red")
                     
             except Exception as e:
-                self.logger.error(f"Error in state machine execution: {str(e)}", exc_info=True)
-                self.status_label.config(text="Error", foreground="red")
+                self._log_run_error("Error in state machine execution", e)
+                self._set_status("Error", "red")
             
             finally:
-                # Cleanup
-                if 'network' in locals():
-                    network.close()
+                # Cleanup (the SUT connection stays open for the next run)
+                if 'background_pool' in locals():
+                    # Collect the last iteration's saves and annotations so their failures are logged
+                    for future in background_futures:
+                        try:
+                            future.result()
+                        except Exception as e:
+                            self.logger.error("Background screenshot task failed: %s", e)
+                    background_pool.shutdown(wait=True)
                 if 'vision_model' in locals() and hasattr(vision_model, 'close'):
                     vision_model.close()
-                # Remove the run-specific log handler
-                if 'run_file_handler' in locals():
-                    logging.getLogger().removeHandler(run_file_handler)
+                # Remove the run-specific log handler and drain the listener
+                if 'run_log_handler' in locals():
+                    logging.getLogger().removeHandler(run_log_handler)
+                    run_log_listener.stop()
+                    run_log_buffer.close()  # Flushes any buffered records
+                    run_file_handler.close()
                     
         except Exception as e:
-            self.logger.error(f"State machine automation failed: {str(e)}", exc_info=True)
+            self._log_run_error("State machine automation failed", e)
 
 if __name__ == "__main__":
     # Ensure the modules can be imported
@@ -8,20 +8,42 @@ import os
 import time
 import logging
 import argparse
-import glob
 import datetime
+import importlib
+from functools import lru_cache
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 from modules.network import NetworkManager
 from modules.screenshot import ScreenshotManager
-from modules.gemma_client import GemmaClient
-from modules.qwen_client import QwenClient
-from modules.omniparser_client import OmniparserClient
 from modules.annotator import Annotator
 from modules.decision_engine import DecisionEngine
 from modules.game_launcher import GameLauncher
 from modules.config_parser import ConfigParser
 
+# Vision model choices: module, client class and display name. Clients are imported only when selected.
+VISION_MODELS = {
+    'gemma': ('modules.gemma_client', 'GemmaClient', 'Gemma'),
+    'qwen': ('modules.qwen_client', 'QwenClient', 'Qwen VL'),
+    'omniparser': ('modules.omniparser_client', 'OmniparserClient', 'Omniparser'),
+}
+
+def create_vision_model(name, model_url):
+    """
+    Import and instantiate the selected vision model client.
+    
+    Args:
+        name: Key into VISION_MODELS
+        model_url: URL of the vision model API
+        
+    Returns:
+        The vision model client instance
+    """
+    module_name, class_name, display_name = VISION_MODELS[name]
+    logging.getLogger(__name__).info(f"Using {display_name} for UI detection")
+    client_cls = getattr(importlib.import_module(module_name), class_name)
+    return client_cls(model_url)
+
 def create_directory_structure(game_name):
     """
     Create the necessary directory structure for a specific game run.
@@ -72,12 +94,20 @@ def parse_arguments():
     
     # Optional arguments with sensible defaults
     parser.add_argument('--sut-port', type=int, default=8080, help='Port for communication with SUT')
-    parser.add_argument('--vision-model', type=str, choices=['gemma', 'qwen', 'omniparser'], default='gemma',
+    parser.add_argument('--vision-model', type=str, choices=list(VISION_MODELS), default='gemma',
                       help='Vision model to use for UI detection (default: gemma)')
     parser.add_argument('--model-url', type=str, default='http://127.0.0.1:1234', 
                       help='URL for the vision model API (default: http://127.0.0.1:1234)')
     parser.add_argument('--max-iterations', type=int, default=50,
                       help='Maximum number of iterations before terminating')
+    parser.add_argument('--save-screenshots', dest='save_screenshots', action='store_true', default=True,
+                      help='Write raw screenshots to the run directory (default: enabled)')
+    parser.add_argument('--no-save-screenshots', dest='save_screenshots', action='store_false',
+                      help='Do not write raw screenshots to the run directory')
+    parser.add_argument('--save-annotated', dest='save_annotated', action='store_true', default=True,
+                      help='Write annotated screenshots to the run directory (default: enabled)')
+    parser.add_argument('--no-save-annotated', dest='save_annotated', action='store_false',
+                      help='Do not write annotated screenshots to the run directory')
     
     return parser.parse_args()
 
@@ -104,6 +134,39 @@ def setup_game_specific_logging(run_dir):
     
     return log_file
 
+@lru_cache(maxsize=4)
+def _scan_configs(directory, mtime_ns):
+    """
+    List the YAML files in a config directory.
+    
+    Args:
+        directory: Directory to scan
+        mtime_ns: Modification time of the directory; part of the cache key so
+            the listing is re-read only when files are added or removed
+        
+    Returns:
+        Tuple of (file name, path) pairs in directory order
+    """
+    with os.scandir(directory) as it:
+        return tuple((entry.name, entry.path) for entry in it
+                     if entry.name.endswith('.yaml') and not entry.name.startswith('.'))
+
+def _config_index(directory):
+    """
+    Return the cached YAML listing for a config directory.
+    
+    Args:
+        directory: Directory to scan
+        
+    Returns:
+        Tuple of (file name, path) pairs, empty if the directory does not exist
+    """
+    try:
+        mtime_ns = os.stat(directory).st_mtime_ns
+    except FileNotFoundError:
+        return ()
+    return _scan_configs(directory, mtime_ns)
+
 def find_game_config(game_name):
     """
     Find the YAML configuration file for a specific game.
@@ -114,15 +177,11 @@ def find_game_config(game_name):
     Returns:
         Path to the game configuration file or None if not found
     """
-    # First try: Search in config/games/ directory
-    game_configs = glob.glob(f"config/games/{game_name}*.yaml")
-    if game_configs:
-        return game_configs[0]
-        
-    # Second try: Check in the config directory directly
-    alt_configs = glob.glob(f"config/{game_name}*.yaml")
-    if alt_configs:
-        return alt_configs[0]
+    # First try: Search in config/games/ directory, then check in the config directory directly
+    for directory in ("config/games", "config"):
+        for name, path in _config_index(directory):
+            if name.startswith(game_name):
+                return path
         
     # No game-specific config found
     return None
@@ -134,18 +193,13 @@ def list_available_games():
     Returns:
         List of available game names
     """
-    games = []
-    
     # Check in config/games/ directory
-    os.makedirs("config/games", exist_ok=True)
-    for config in glob.glob("config/games/*.yaml"):
-        game_name = os.path.basename(config).replace('.yaml', '')
-        games.append(game_name)
+    games = [name[:-len('.yaml')] for name, _ in _config_index("config/games")]
     
     # Check in config directory directly
-    for config in glob.glob("config/*.yaml"):
-        if "template" not in config.lower():  # Skip template files
-            game_name = os.path.basename(config).replace('.yaml', '')
+    for name, _ in _config_index("config"):
+        if "template" not in name.lower():  # Skip template files
+            game_name = name[:-len('.yaml')]
             if game_name not in games:
                 games.append(game_name)
     
@@ -204,18 +258,12 @@ def main():
     # Initialize components
     try:
         network = NetworkManager(args.sut_ip, args.sut_port)
-        screenshot_mgr = ScreenshotManager(network)
+        # Screenshots can be requested as JPEG (metadata screenshot_format: jpeg) for a smaller, faster payload
+        screenshot_format = config_parser.get_config().get("metadata", {}).get("screenshot_format", "png")
+        screenshot_mgr = ScreenshotManager(network, image_format=screenshot_format)
         
         # Initialize the vision model based on user selection
-        if args.vision_model == 'gemma':
-            logger.info("Using Gemma for UI detection")
-            vision_model = GemmaClient(args.model_url)
-        elif args.vision_model == 'qwen':
-            logger.info("Using Qwen VL for UI detection")
-            vision_model = QwenClient(args.model_url)
-        elif args.vision_model == 'omniparser':
-            logger.info("Using Omniparser for UI detection")
-            vision_model = OmniparserClient(args.model_url)
+        vision_model = create_vision_model(args.vision_model, args.model_url)
         
         annotator = Annotator()
         decision_engine = DecisionEngine(config_parser.get_config())
@@ -226,6 +274,11 @@ def main():
         benchmark_duration = game_metadata.get("benchmark_duration", 120)
         logger.info(f"Expected benchmark duration: {benchmark_duration} seconds")
         
+        # Saving and annotating screenshots runs in the background, overlapping the decision,
+        # action and transition delay; two workers bound how many frames are held in memory
+        io_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="run-io")
+        io_futures = []
+        
         # Main execution loop
         iteration = 0
         current_state = "initial"
@@ -235,6 +288,11 @@ def main():
         state_start_time = time.time()
         max_time_in_state = 60  # Default maximum seconds to remain in the same state
         
+        # State definitions and transitions don't change during a run, so look them up once
+        config = config_parser.get_config()
+        state_defs = config.get("states", {})
+        transitions = config.get("transitions", {})
+        
         try:
             # Launch the game
             logger.info(f"Launching game from: {args.game_path}")
@@ -250,7 +308,7 @@ def main():
                 logger.info(f"Iteration {iteration}: Current state: {current_state}")
                 
                 # Get state-specific timeout from config or use default
-                state_def = config_parser.get_state_definition(current_state)
+                state_def = state_defs.get(current_state)
                 state_timeout = state_def.get("timeout", max_time_in_state) if state_def else max_time_in_state
                 
                 # Check for timeout in current state
@@ -271,19 +329,29 @@ def main():
                     state_start_time = time.time()
                     continue
                     
-                # Capture screenshot - USE RUN DIRECTORY
-                screenshot_path = f"{dirs['screenshots_dir']}/screenshot_{iteration}.png"
-                screenshot_mgr.capture(screenshot_path)
+                # Collect the previous iteration's background work first so failures still surface
+                for future in io_futures:
+                    future.result()
+                io_futures = []
+                
+                # Capture screenshot into memory - saved to RUN DIRECTORY only if requested
+                screenshot_path = f"{dirs['screenshots_dir']}/screenshot_{iteration}{screenshot_mgr.file_extension}"
+                screenshot_data = screenshot_mgr.capture_bytes()
+                if args.save_screenshots:
+                    io_futures.append(io_pool.submit(screenshot_mgr.save, screenshot_path, screenshot_data))
                 logger.info(f"Screenshot captured: {screenshot_path}")
                 
                 # Process with vision model
-                bounding_boxes = vision_model.detect_ui_elements(screenshot_path)
+                bounding_boxes = vision_model.detect_ui_elements(screenshot_path, image_data=screenshot_data)
                 logger.info(f"Detected {len(bounding_boxes)} UI elements")
                 
-                # Annotate screenshot - USE RUN DIRECTORY
-                annotated_path = f"{dirs['annotated_dir']}/annotated_{iteration}.png"
-                annotator.draw_bounding_boxes(screenshot_path, bounding_boxes, annotated_path)
-                logger.info(f"Annotated screenshot saved: {annotated_path}")
+                # Annotate screenshot - USE RUN DIRECTORY (skipped with --no-save-annotated)
+                if args.save_annotated:
+                    annotated_path = f"{dirs['annotated_dir']}/annotated_{iteration}.png"
+                    io_futures.append(io_pool.submit(
+                        annotator.draw_bounding_boxes, screenshot_path, bounding_boxes, annotated_path, image_data=screenshot_data
+                    ))
+                    logger.info(f"Annotated screenshot saved: {annotated_path}")
                 
                 # Determine next action
                 previous_state = current_state
@@ -335,8 +403,7 @@ def main():
                     logger.info(f"State changed from {previous_state} to {current_state}")
                 
                 # Get delay from transition if specified
-                transition_key = f"{previous_state}->{current_state}"
-                transition = config_parser.get_config().get("transitions", {}).get(transition_key, {})
+                transition = transitions.get(f"{previous_state}->{current_state}", {})
                 delay = transition.get("expected_delay", 1)
                 
                 time.sleep(delay)  # Wait before next iteration
@@ -357,6 +424,13 @@ def main():
         finally:
             # Cleanup
             logger.info("Cleaning up resources")
+            # Collect the last iteration's saves and annotations so their failures are logged
+            for future in io_futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"Background screenshot task failed: {str(e)}")
+            io_pool.shutdown(wait=True)
             network.close()
             if hasattr(vision_model, 'close'):
                 vision_model.close()
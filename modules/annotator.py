@@ -5,6 +5,8 @@ Annotator module for visualizing detected UI elements on screenshots.
 import os
 import logging
 import random
+from functools import lru_cache
+from io import BytesIO
 from typing import List
 from PIL import Image, ImageDraw, ImageFont
 import colorsys
@@ -13,9 +15,46 @@ from modules.gemma_client import BoundingBox
 
 logger = logging.getLogger(__name__)
 
+# Problematic Unicode characters and their ASCII equivalents, applied in a single str.translate pass
+_TRANSLATE_TABLE = str.maketrans({
+    '\u2022': '*',  # bullet point
+    '\u2018': "'",  # left single quote
+    '\u2019': "'",  # right single quote
+    '\u201c': '"',  # left double quote
+    '\u201d': '"',  # right double quote
+    '\u2013': '-',  # en dash
+    '\u2014': '--', # em dash
+    '\u2026': '...' # ellipsis
+})
+
+# Common system TrueType fonts, tried before Pillow's bitmap default (FreeType caches glyphs; the bitmap font doesn't)
+_SYSTEM_FONT_PATHS = (
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "C:/Windows/Fonts/arial.ttf",
+    "/System/Library/Fonts/Helvetica.ttc",
+)
+
+@lru_cache(maxsize=16)
+def _load_truetype(font_path: str, font_size: int):
+    """
+    Load a TrueType font once per (path, size) so all Annotator instances share it.
+    
+    Args:
+        font_path: Path to a TrueType font file
+        font_size: Font size in points
+    
+    Returns:
+        The loaded FreeTypeFont
+    """
+    return ImageFont.truetype(font_path, font_size)
+
 class Annotator:
     """Handles drawing bounding boxes on screenshots."""
     
+    # Output directories already created, so makedirs runs once per directory rather than per image;
+    # a directory removed later is recreated when saving into it fails
+    _ensured_dirs = set()
+    
     def __init__(self, font_path: str = None, font_size: int = 14):
         """
         Initialize the annotator.
@@ -30,11 +69,22 @@ class Annotator:
         # Try to load font if provided
         if font_path and os.path.exists(font_path):
             try:
-                self.font = ImageFont.truetype(font_path, font_size)
+                self.font = _load_truetype(font_path, font_size)
                 logger.info(f"Loaded font from {font_path}")
             except Exception as e:
                 logger.warning(f"Failed to load font: {str(e)}. Using default font.")
         
+        # Otherwise prefer a TrueType system font
+        if not self.font:
+            for system_font in _SYSTEM_FONT_PATHS:
+                if os.path.exists(system_font):
+                    try:
+                        self.font = _load_truetype(system_font, font_size)
+                        logger.info(f"Loaded system font from {system_font}")
+                        break
+                    except Exception as e:
+                        logger.debug(f"Failed to load system font {system_font}: {str(e)}")
+        
         # Fall back to default font if needed
         if not self.font:
             try:
@@ -43,17 +93,39 @@ class Annotator:
             except Exception as e:
                 logger.warning(f"Failed to load default font: {str(e)}")
         
+        # Label sizes depend only on the text and font, so measurements are cached across boxes and images
+        self._measure_draw = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+        self._measure_text = lru_cache(maxsize=1024)(self._text_size)
+        
         logger.info("Annotator initialized")
     
-    def _generate_colors(self, n: int):
+    def _text_size(self, label: str):
+        """
+        Measure the rendered size of a label in the annotator font.
+        
+        Args:
+            label: Label text
+        
+        Returns:
+            Tuple of (width, height) in pixels
+        """
+        left, top, right, bottom = self._measure_draw.textbbox((0, 0), label, font=self.font)
+        return right - left, bottom - top
+    
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _generate_colors(n: int):
         """
         Generate visually distinct colors for different UI element types.
         
+        The palette depends only on n, so it is computed once per distinct
+        number of element types and reused for later screenshots.
+        
         Args:
             n: Number of colors to generate
         
         Returns:
-            List of RGB color tuples
+            Tuple of RGB color tuples
         """
         colors = []
         for i in range(n):
@@ -63,7 +135,7 @@ class Annotator:
             v = 0.9
             r, g, b = colorsys.hsv_to_rgb(h, s, v)
             colors.append((int(r * 255), int(g * 255), int(b * 255)))
-        return colors
+        return tuple(colors)
     
     def _sanitize_text(self, text: str) -> str:
         """
@@ -75,25 +147,11 @@ class Annotator:
         Returns:
             Sanitized text safe for rendering
         """
-        # Replace problematic Unicode characters with ASCII equivalents
-        replacements = {
-            '\u2022': '*',  # bullet point
-            '\u2018': "'",  # left single quote
-            '\u2019': "'",  # right single quote
-            '\u201c': '"',  # left double quote
-            '\u201d': '"',  # right double quote
-            '\u2013': '-',  # en dash
-            '\u2014': '--', # em dash
-            '\u2026': '...' # ellipsis
-        }
-        
-        for char, replacement in replacements.items():
-            text = text.replace(char, replacement)
-            
-        # As a last resort, remove any remaining non-ASCII characters
-        return ''.join(c for c in text if ord(c) < 128)
+        # Replace problematic Unicode characters with ASCII equivalents, then
+        # as a last resort remove any remaining non-ASCII characters
+        return text.translate(_TRANSLATE_TABLE).encode('ascii', 'ignore').decode('ascii')
     
-    def draw_bounding_boxes(self, image_path: str, bboxes: List[BoundingBox], output_path: str) -> bool:
+    def draw_bounding_boxes(self, image_path: str, bboxes: List[BoundingBox], output_path: str, image_data: bytes = None) -> bool:
         """
         Draw bounding boxes on an image and save the result.
         
@@ -101,6 +159,8 @@ class Annotator:
             image_path: Path to the original screenshot
             bboxes: List of BoundingBox objects to draw
             output_path: Path to save the annotated image
+            image_data: Raw image bytes already in memory; when given the file
+                at image_path is not read
         
         Returns:
             True if successful
@@ -110,57 +170,71 @@ class Annotator:
         """
         try:
             # Ensure output directory exists
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            output_dir = os.path.dirname(output_path)
+            if output_dir not in self._ensured_dirs:
+                os.makedirs(output_dir, exist_ok=True)
+                self._ensured_dirs.add(output_dir)
             
             # Open the image
-            image = Image.open(image_path)
+            image = Image.open(BytesIO(image_data) if image_data is not None else image_path)
+            # Decode once up front; this also releases the source file before the slow drawing and encoding
+            image.load()
+            # Draw and encode in RGB; palette or alpha images would otherwise be converted on every draw call
+            if image.mode != "RGB":
+                image = image.convert("RGB")
             draw = ImageDraw.Draw(image)
             
-            # Get unique element types for color assignment
-            element_types = list(set(bbox.element_type for bbox in bboxes))
+            # Get unique element types for color assignment, in first-seen order so colors are stable across runs
+            element_types = dict.fromkeys(bbox.element_type for bbox in bboxes)
             colors = self._generate_colors(len(element_types))
-            color_map = {element_type: colors[i] for i, element_type in enumerate(element_types)}
+            color_map = dict(zip(element_types, colors))
+            # Element types come from the vision model too, so sanitize each distinct type once
+            type_labels = {t: self._sanitize_text(str(t)) for t in element_types}
+            
+            # Each draw call is a single C-level operation; bind them once for the per-box loop
+            rectangle, draw_text, font, measure = draw.rectangle, draw.text, self.font, self._measure_text
             
             # Draw each bounding box
             for bbox in bboxes:
                 # Get color for this element type
-                color = color_map.get(bbox.element_type, (255, 0, 0))  # Red as fallback
+                color = color_map[bbox.element_type]
                 
                 # Calculate coordinates for rectangle
                 x1, y1 = bbox.x, bbox.y
                 x2, y2 = bbox.x + bbox.width, bbox.y + bbox.height
                 
                 # Draw rectangle with a 3-pixel width
-                draw.rectangle([x1, y1, x2, y2], outline=color, width=3)
+                rectangle([x1, y1, x2, y2], outline=color, width=3)
                 
                 # Prepare label text
                 conf_pct = int(bbox.confidence * 100)
-                label = f"{bbox.element_type} {conf_pct}%"
+                label = f"{type_labels[bbox.element_type]} {conf_pct}%"
                 if bbox.element_text:
-                    # Sanitize text to avoid Unicode issues
                     safe_text = self._sanitize_text(bbox.element_text)
                     if len(safe_text) > 20:
                         safe_text = safe_text[:17] + "..."
                     label += f": {safe_text}"
                 
-                # Sanitize the entire label
-                label = self._sanitize_text(label)
-                
                 try:
                     # Add background for text
-                    text_bbox = draw.textbbox((0, 0), label, font=self.font)
-                    text_w, text_h = text_bbox[2] - text_bbox[0], text_bbox[3] - text_bbox[1]
-                    draw.rectangle([x1, y1 - text_h - 4, x1 + text_w + 4, y1], fill=color)
+                    text_w, text_h = measure(label)
+                    rectangle([x1, y1 - text_h - 4, x1 + text_w + 4, y1], fill=color)
                     
                     # Draw label text in black
-                    draw.text((x1 + 2, y1 - text_h - 2), label, fill=(0, 0, 0), font=self.font)
+                    draw_text((x1 + 2, y1 - text_h - 2), label, fill=(0, 0, 0), font=font)
                 except Exception as e:
                     logger.warning(f"Could not render text '{label}': {str(e)}")
                     # Fallback to a very simple label if text rendering fails
-                    draw.rectangle([x1, y1 - 15, x1 + 40, y1], fill=color)
+                    rectangle([x1, y1 - 15, x1 + 40, y1], fill=color)
             
             # Save the annotated image
-            image.save(output_path)
+            # zlib level 1 encodes several times faster than the default level 6 for a slightly larger file
+            try:
+                image.save(output_path, compress_level=1)
+            except FileNotFoundError:
+                # The directory was deleted after it was first created
+                os.makedirs(output_dir, exist_ok=True)
+                image.save(output_path, compress_level=1)
             logger.info(f"Annotated image saved to {output_path}")
             return True
             
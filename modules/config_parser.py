@@ -6,14 +6,29 @@ Updated to support modular action format:
 - Wait-only: action: wait
 
 Removes legacy find_and_click support.
+
+ConfigParser reads the state machine configurations used by main.py.
 """
 
 import yaml
 import logging
 from typing import Dict, Any, Optional
 
+from modules.yaml_cache import load_yaml, is_validated, mark_validated
+
 logger = logging.getLogger(__name__)
 
+# Action types accepted in a step's 'action' section
+_VALID_ACTION_TYPES = frozenset((
+    "click", "double_click", "right_click", "middle_click",
+    "key", "keypress", "hotkey", "type", "text", "input",
+    "drag", "drag_drop", "scroll", "wait",
+    "conditional", "sequence"
+))
+
+# Actions that may be given as a plain string
+_VALID_SIMPLE_ACTIONS = frozenset(("wait",))
+
 class SimpleConfigParser:
     """
     Parser for simple automation configurations supporting modular actions.
@@ -32,15 +47,21 @@ class SimpleConfigParser:
         """
         self.config_path = config_path
         self.config = {}
+        self._config_key = None
         self._load_config()
-        self._validate_config()
+        # An unchanged file that validated before doesn't need validating again
+        # (its warnings were logged the first time)
+        if is_validated(self._config_key, __name__):
+            logger.debug(f"Configuration {self.config_path} already validated")
+        else:
+            self._validate_config()
+            mark_validated(self._config_key, __name__)
     
     def _load_config(self):
         """Load and parse the YAML configuration file."""
         try:
-            with open(self.config_path, 'r', encoding='utf-8') as file:
-                self.config = yaml.safe_load(file)
-                logger.info(f"Loaded configuration from {self.config_path}")
+            self.config, self._config_key = load_yaml(self.config_path)
+            logger.info(f"Loaded configuration from {self.config_path}")
         except FileNotFoundError:
             logger.error(f"Configuration file not found: {self.config_path}")
             raise
@@ -124,8 +145,7 @@ class SimpleConfigParser:
         """Validate the action section of a step."""
         if isinstance(action_config, str):
             # Simple string actions like "wait"
-            valid_simple_actions = ["wait"]
-            if action_config not in valid_simple_actions:
+            if action_config not in _VALID_SIMPLE_ACTIONS:
                 logger.warning(f"Step {step_num}: Unknown simple action '{action_config}'")
         elif isinstance(action_config, dict):
             # Complex action configurations
@@ -133,13 +153,7 @@ class SimpleConfigParser:
                 logger.warning(f"Step {step_num}: 'action' section missing 'type' attribute")
             else:
                 action_type = action_config.get("type", "").lower()
-                valid_action_types = [
-                    "click", "double_click", "right_click", "middle_click",
-                    "key", "keypress", "hotkey", "type", "text", "input",
-                    "drag", "drag_drop", "scroll", "wait",
-                    "conditional", "sequence"
-                ]
-                if action_type not in valid_action_types:
+                if action_type not in _VALID_ACTION_TYPES:
                     logger.warning(f"Step {step_num}: Unknown action type '{action_type}'")
         else:
             raise ValueError(f"Step {step_num}: 'action' must be string or dictionary")
@@ -203,4 +217,81 @@ class SimpleConfigParser:
         Returns:
             True if step is wait-only
         """
-        return "action" in step and self._is_wait_action(step["action"])
\ No newline at end of file
+        return "action" in step and self._is_wait_action(step["action"])
+
+
+class ConfigParser:
+    """
+    Parser for state machine configurations (states + transitions).
+    """
+    
+    # Sections every state machine config must define
+    REQUIRED_SECTIONS = ("states", "transitions", "initial_state", "target_state")
+    
+    def __init__(self, config_path: str):
+        """
+        Initialize the parser with a configuration file.
+        
+        Args:
+            config_path: Path to the YAML configuration file
+        
+        Raises:
+            ValueError: If the config is not a valid state machine config
+        """
+        self.config_path = config_path
+        try:
+            self.config, self._config_key = load_yaml(config_path)
+        except FileNotFoundError:
+            logger.error(f"Configuration file not found: {config_path}")
+            raise
+        except yaml.YAMLError as e:
+            logger.error(f"Failed to parse YAML configuration: {str(e)}")
+            raise
+        self._validate_config()
+        
+        self.game_name = self.config.get("metadata", {}).get("game_name", "Unknown Game")
+        logger.info(f"Loaded state machine configuration for {self.game_name} from {config_path}")
+    
+    def _validate_config(self):
+        """
+        Check that the config is a mapping with every required section.
+        
+        Raises:
+            ValueError: If the config is invalid
+        """
+        if not isinstance(self.config, dict):
+            raise ValueError("Invalid config: expected a YAML mapping")
+        for section in self.REQUIRED_SECTIONS:
+            if section not in self.config:
+                logger.error(f"Missing required '{section}' section in config")
+                raise ValueError(f"Invalid config: missing '{section}' section")
+    
+    def get_config(self) -> Dict[str, Any]:
+        """
+        Get the parsed configuration.
+        
+        Returns:
+            Configuration dictionary
+        """
+        return self.config
+    
+    def get_state_definition(self, state_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the definition for a specific state.
+        
+        Args:
+            state_name: Name of the state
+        
+        Returns:
+            State definition dictionary or None if not found
+        """
+        return self.config.get("states", {}).get(state_name)
+    
+    def get_metadata(self) -> Dict[str, Any]:
+        """
+        Get game metadata from the configuration.
+        
+        Returns:
+            Metadata dictionary with game information
+        """
+        return self.config.get("metadata", {})
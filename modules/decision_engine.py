@@ -4,30 +4,146 @@ Supports flexible text matching and state context for any game benchmark.
 """
 
 import logging
+import re
+import sys
 import time
-from typing import List, Dict, Any, Tuple, Optional, Set
+from collections import deque
+from typing import List, Dict, Any, Tuple, Optional, Set, NamedTuple, Callable
 
 from modules.gemma_client import BoundingBox
 
 logger = logging.getLogger(__name__)
 
+
+def _intern(value: Any) -> Any:
+    """Intern string values; anything else (e.g. numeric YAML state names) is returned as is."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+# Builders for each text_match mode; each takes the lowercased rule text and
+# returns a test for an element's lowercased text
+_TEXT_MATCHERS = {
+    "exact": lambda needle: needle.__eq__,
+    "contains": lambda needle: lambda text_lower: needle in text_lower,
+    "startswith": lambda needle: lambda text_lower: text_lower.startswith(needle),
+    "endswith": lambda needle: lambda text_lower: text_lower.endswith(needle),
+}
+
+
+def _match_any_text(text_lower: str) -> bool:
+    """Text test for rules without a text requirement."""
+    return True
+
+
+def _match_no_text(text_lower: str) -> bool:
+    """Text test for rules with an unknown text_match mode."""
+    return False
+
+
+def _build_text_matcher(text: Any, text_match: str) -> Callable[[str], bool]:
+    """
+    Build the text test for an element rule.
+    
+    Args:
+        text: Rule text from the config
+        text_match: Match mode (exact, contains, startswith or endswith)
+    
+    Returns:
+        Function taking an element's lowercased text and returning True on a match
+    """
+    # If no text requirement, consider it a match
+    if not text:
+        return _match_any_text
+    builder = _TEXT_MATCHERS.get(text_match)
+    if builder is None:
+        return _match_no_text
+    # A non-empty needle never matches empty element text in any mode
+    return builder(str(text).lower())
+
+
+class _ElementRule(NamedTuple):
+    """A required or excluded element from a state definition, read once from the config."""
+    type: str
+    scan_all: bool  # True when the rule matches elements of any type
+    text: str
+    matches: Callable[[str], bool]  # Tests an element's lowercased text
+    exact_text: Optional[str]  # Lowercased text for exact-match rules, else None
+    match_key: Tuple[Any, str, str]  # Rules with equal keys select the same elements by type and text
+    min_confidence: float
+    source: Dict[str, Any]  # Original config entry, for logging
+
+
+class _StateSpec(NamedTuple):
+    """Precompiled matching rules for one state."""
+    excludes: Tuple[_ElementRule, ...]
+    requires: Tuple[_ElementRule, ...]
+    required_types: Tuple[str, ...]  # Element types the state can't match without
+
+
+class _TransitionSpec(NamedTuple):
+    """Precompiled action settings for one transition."""
+    transition_key: str
+    action: str
+    # Actions that don't depend on the frame are built once; callers get copies
+    hardcoded: Optional[Dict[str, Any]]
+    target: Optional[_ElementRule]
+    fallback: Optional[Dict[str, Any]]
+    key_action: Optional[Dict[str, Any]]
+    wait_action: Dict[str, Any]
+
+
+_EMPTY_STATE = _StateSpec((), (), ())
+
+
+class _Frame(NamedTuple):
+    """A frame's detected elements, each paired with its lowercased text."""
+    entries: List[Tuple[BoundingBox, str]]
+    by_type: Dict[str, List[Tuple[BoundingBox, str]]]  # Entries bucketed by element type
+    texts: Set[str]  # Every lowercased text in the frame
+    matched: Dict[Tuple[Any, str, str], BoundingBox]  # First text match per rule match_key, found while matching states
+
+# Match returned for states with no required elements
+_NO_REQUIREMENTS_MATCH = BoundingBox(x=0, y=0, width=0, height=0, confidence=1.0,
+                                     element_type="dummy", element_text="No required elements")
+
+
 class DecisionEngine:
     """
     FSM-based decision engine with enhanced flexibility for different games.
     """
     
+    # Default recovery action; callers get a copy so the template can't be modified
+    _ESCAPE_ACTION = {"type": "key", "key": "escape"}
+    
+    # Pause returned (as a copy) while falling back to the initial state
+    _WAIT_FOR_INITIAL_ACTION = {"type": "wait", "duration": 3}
+    
+    # Number of recent frames whose identified state is remembered
+    STATE_CACHE_SIZE = 8
+    
+    # Number of state changes kept in the history; visited_states still
+    # records every state seen
+    STATE_HISTORY_SIZE = 256
+    
+    # Words that suggest a benchmark results screen, as one pattern so each
+    # element's text is scanned once rather than once per keyword
+    _RESULT_KEYWORDS = ("result", "fps", "score", "performance", "benchmark", "complete", "average")
+    _RESULT_KEYWORDS_RE = re.compile("|".join(map(re.escape, _RESULT_KEYWORDS)))
+    
     def __init__(self, config: Dict[str, Any]):
         """Initialize the decision engine with game-specific configuration."""
         self.config = config
-        self.states = config.get("states", {})
+        # State names are compared constantly at runtime; interning them once
+        # lets equal names share one object, so comparisons hit the identity check
+        self.states = {_intern(name): state for name, state in config.get("states", {}).items()}
         self.transitions = config.get("transitions", {})
         self.fallbacks = config.get("fallbacks", {})
-        self.current_state = config.get("initial_state", "initial")
-        self.target_state = config.get("target_state", "completed")
+        self.current_state = _intern(config.get("initial_state", "initial"))
+        self.target_state = _intern(config.get("target_state", "completed"))
         self.game_name = config.get("metadata", {}).get("game_name", "Unknown Game")
         
         # FSM enhancements
-        self.state_history = []  # Track visited states
+        self.state_history = deque(maxlen=self.STATE_HISTORY_SIZE)  # Track recently visited states
         self.state_context = {}  # Context variables
         self.visited_states = set()  # Set of visited states
         self.transitions_taken = set()  # Track which transitions we've already used
@@ -35,12 +151,126 @@ class DecisionEngine:
         self.benchmark_started_at = None
         self.benchmark_completed_at = None
         
+        # Recently identified states, keyed by frame fingerprint (oldest first)
+        self._state_cache = {}
+        
+        # Index transitions once so decisions don't rescan every key
+        self._outgoing, self._transition_by_pair = self._index_transitions()
+        
+        # Read state matching rules once instead of on every frame
+        self._state_specs = {name: self._compile_state(state_def)
+                             for name, state_def in self.states.items()}
+        
         # Build state graph for validation
         self.state_graph = self._build_state_graph()
         
         logger.info(f"DecisionEngine initialized for {self.game_name} with {len(self.states)} states")
         logger.info(f"Initial state: {self.current_state}, Target state: {self.target_state}")
     
+    def _index_transitions(self) -> Tuple[Dict[str, List[str]], Dict[Tuple[str, str], Optional[_TransitionSpec]]]:
+        """
+        Split every transition key once and precompile its action settings.
+        
+        Returns:
+            Tuple of (from_state -> to_states in config order,
+            (from_state, to_state) -> compiled transition, None if the definition is empty)
+        """
+        outgoing = {}
+        by_pair = {}
+        for transition_key, transition in self.transitions.items():
+            # partition never raises, so well-formed keys skip exception handling entirely
+            from_state, sep, to_state = transition_key.partition("->")
+            if not sep or "->" in to_state:
+                logger.error(f"Invalid transition key format: {transition_key}")
+                continue
+            from_state = _intern(from_state)
+            to_state = _intern(to_state)
+            outgoing.setdefault(from_state, []).append(to_state)
+            by_pair[(from_state, to_state)] = self._compile_transition(transition_key, transition)
+        return outgoing, by_pair
+    
+    @staticmethod
+    def _compile_rule(rule: Dict[str, Any], default_confidence: float = 0.0) -> _ElementRule:
+        """
+        Read an element rule from the config.
+        
+        Args:
+            rule: Element rule with type, text, text_match and optional required_confidence
+            default_confidence: Confidence threshold when the rule doesn't set one
+        
+        Returns:
+            Compiled element rule
+        """
+        element_type = rule.get("type", "any")
+        text = rule.get("text", "")
+        text_match = rule.get("text_match", "exact")
+        element_type = _intern(element_type)
+        scan_all = element_type == "any" or not element_type
+        return _ElementRule(
+            type=element_type,
+            scan_all=scan_all,
+            text=text,
+            matches=_build_text_matcher(text, text_match),
+            exact_text=str(text).lower() if text and text_match == "exact" else None,
+            match_key=(None if scan_all else element_type, text_match, str(text).lower() if text else ""),
+            min_confidence=rule.get("required_confidence", default_confidence),
+            source=rule
+        )
+    
+    def _compile_state(self, state_def: Dict[str, Any]) -> _StateSpec:
+        """
+        Read a state's required and excluded elements from the config.
+        
+        Args:
+            state_def: State definition from the config
+        
+        Returns:
+            Compiled state rules
+        """
+        requires = tuple(self._compile_rule(rule, 0.6) for rule in state_def.get("required_elements", []))
+        return _StateSpec(
+            excludes=tuple(self._compile_rule(rule) for rule in state_def.get("exclude_elements", [])),
+            requires=requires,
+            required_types=tuple(dict.fromkeys(rule.type for rule in requires if not rule.scan_all))
+        )
+    
+    def _compile_transition(self, transition_key: str,
+                            transition: Dict[str, Any]) -> Optional[_TransitionSpec]:
+        """
+        Read a transition's action settings from the config.
+        
+        Args:
+            transition_key: Transition key in "from->to" form
+            transition: Transition definition from the config
+        
+        Returns:
+            Compiled transition, or None if the definition is empty
+        """
+        if not transition:
+            return None
+        
+        hardcoded = None
+        if "hardcoded_coords" in transition:
+            coords = transition.get("hardcoded_coords", {})
+            hardcoded = {"type": "click", "x": coords.get("x", 0), "y": coords.get("y", 0)}
+        
+        fallback = None
+        fallback_coords = transition.get("fallback_coords", {})
+        if fallback_coords:
+            fallback = {"type": "click", "x": fallback_coords.get("x", 0), "y": fallback_coords.get("y", 0)}
+        
+        action = transition.get("action", "")
+        key = transition.get("key", "")
+        return _TransitionSpec(
+            transition_key=transition_key,
+            action=action,
+            hardcoded=hardcoded,
+            target=self._compile_rule(transition.get("target", {})) if action == "click" else None,
+            fallback=fallback,
+            key_action={"type": "key", "key": key} if key else None,
+            wait_action={"type": "wait", "duration": transition.get("duration", 1)}
+        )
+    
     def _build_state_graph(self) -> Dict[str, Set[str]]:
         """
         Build a graph representation of possible state transitions.
@@ -48,15 +278,16 @@ class DecisionEngine:
         Returns:
             Dictionary mapping from_state to set of possible to_states
         """
-        graph = {}
-        for transition_key in self.transitions:
-            try:
-                from_state, to_state = transition_key.split("->")
-                if from_state not in graph:
-                    graph[from_state] = set()
-                graph[from_state].add(to_state)
-            except ValueError:
-                logger.error(f"Invalid transition key format: {transition_key}")
+        graph = {from_state: set(to_states) for from_state, to_states in self._outgoing.items()}
+
+        # Collect every endpoint once and diff against the known states,
+        # rather than looking up each transition's states one by one
+        endpoints = set(graph).union(*graph.values())
+        allowed = set(self.states)
+        allowed.update(("initial", "completed", self.current_state, self.target_state))
+        for state_name in sorted(endpoints - allowed):
+            logger.warning("Transition references undefined state: %s", state_name)
+
         return graph
     
     def get_target_state(self) -> str:
@@ -68,142 +299,199 @@ class DecisionEngine:
         """
         return self.target_state
     
+    @staticmethod
+    def _prepare_frame(bounding_boxes: List[BoundingBox]) -> _Frame:
+        """
+        Lowercase each element's text once and bucket the elements by type.
+        
+        Args:
+            bounding_boxes: List of detected UI elements
+        
+        Returns:
+            Frame index used by the state and action matchers
+        """
+        entries = []
+        by_type = {}
+        texts = set()
+        intern = sys.intern
+        for bbox in bounding_boxes:
+            text_lower = (bbox.element_text or "").lower()
+            entry = (bbox, text_lower)
+            entries.append(entry)
+            texts.add(text_lower)
+            element_type = bbox.element_type
+            # Interned keys let lookups with the interned rule types match by identity
+            if type(element_type) is str:
+                element_type = intern(element_type)
+            by_type.setdefault(element_type, []).append(entry)
+        return _Frame(entries, by_type, texts, {})
+    
     def _find_matching_element(self, state_def: Dict[str, Any], 
-                          bounding_boxes: List[BoundingBox]) -> Optional[BoundingBox]:
+                          bounding_boxes: List[BoundingBox],
+                          frame: Optional[_Frame] = None) -> Optional[BoundingBox]:
         """
         Find a UI element that matches the state definition with flexible matching.
         
         Args:
             state_def: State definition from the config
             bounding_boxes: List of detected UI elements
+            frame: Prepared frame index; built from bounding_boxes if not given
+        
+        Returns:
+            Matching BoundingBox or None if no match
+        """
+        return self._match_state(self._compile_state(state_def), bounding_boxes, frame)
+    
+    def _match_state(self, spec: _StateSpec,
+                     bounding_boxes: List[BoundingBox],
+                     frame: Optional[_Frame] = None) -> Optional[BoundingBox]:
+        """
+        Find a UI element that satisfies a compiled state's rules.
+        
+        Args:
+            spec: Compiled state rules
+            bounding_boxes: List of detected UI elements
+            frame: Prepared frame index; built from bounding_boxes if not given
         
         Returns:
             Matching BoundingBox or None if no match
         """
+        # With nothing required or excluded, the state matches any frame
+        if not spec.requires and not spec.excludes:
+            logger.debug("No required elements specified, and no excluded elements found")
+            return _NO_REQUIREMENTS_MATCH
+        
+        if frame is None:
+            frame = self._prepare_frame(bounding_boxes)
+        entries, by_type, texts, matched = frame
+        
+        # A state needing an element type that wasn't detected can't match
+        for required_type in spec.required_types:
+            if required_type not in by_type:
+                return None
+        
         # First check if any excluded elements are present
-        exclude_elements = state_def.get("exclude_elements", [])
-        for excluded in exclude_elements:
-            excl_type = excluded.get("type", "any")
-            excl_text = excluded.get("text", "")
-            excl_match_type = excluded.get("text_match", "exact")
+        for excluded in spec.excludes:
+            # An exact text that appears nowhere in the frame can't be present
+            if excluded.exact_text is not None and excluded.exact_text not in texts:
+                continue
             
-            for bbox in bounding_boxes:
-                # Type matching for excluded elements
-                type_match = (excl_type == "any" or 
-                            not excl_type or 
-                            bbox.element_type == excl_type)
-                
-                # Text matching for excluded elements
-                text_match = False
-                if bbox.element_text and excl_text:
-                    if excl_match_type == "exact":
-                        text_match = excl_text.lower() == bbox.element_text.lower()
-                    elif excl_match_type == "contains":
-                        text_match = excl_text.lower() in bbox.element_text.lower()
-                    elif excl_match_type == "startswith":
-                        text_match = bbox.element_text.lower().startswith(excl_text.lower())
-                    elif excl_match_type == "endswith":
-                        text_match = bbox.element_text.lower().endswith(excl_text.lower())
-                elif not excl_text:
-                    text_match = True
-                    
-                if type_match and text_match:
+            # Only elements of the excluded type can match
+            candidates = entries if excluded.scan_all else by_type.get(excluded.type, ())
+            for bbox, text_lower in candidates:
+                if excluded.matches(text_lower):
                     # Found an excluded element - this state cannot be a match
-                    excluded_details = f"type: '{bbox.element_type}', text: '{bbox.element_text}'"
-                    logger.info(f"Found excluded element: {excluded_details} - state cannot be matched")
+                    logger.info("Found excluded element: type: '%s', text: '%s' - state cannot be matched",
+                                bbox.element_type, bbox.element_text)
                     return None
         
-        # Now check for required elements
-        required_elements = state_def.get("required_elements", [])
-        
         # If we have no required elements, but passed the exclusion check, it's a match
-        if not required_elements:
+        if not spec.requires:
             logger.debug("No required elements specified, and no excluded elements found")
-            return BoundingBox(x=0, y=0, width=0, height=0, confidence=1.0, 
-                            element_type="dummy", element_text="No required elements")
+            return _NO_REQUIREMENTS_MATCH
         
         # Check each required element
-        for required in required_elements:
-            req_type = required.get("type", "any")
-            req_text = required.get("text", "")
-            text_match_type = required.get("text_match", "exact")
-            min_confidence = required.get("required_confidence", 0.6)
+        for required in spec.requires:
+            # An exact text that appears nowhere in the frame can't be found
+            if required.exact_text is not None and required.exact_text not in texts:
+                logger.debug("Required element not found: %s", required.source)
+                return None
             
-            # Try to find a matching element
-            matched = False
-            for bbox in bounding_boxes:
-                # Type matching - handle "any" type
-                type_match = (req_type == "any" or 
-                            not req_type or 
-                            bbox.element_type == req_type)
-                
-                # Text matching with different strategies
-                text_match = False
-                if bbox.element_text and req_text:
-                    if text_match_type == "exact":
-                        text_match = req_text.lower() == bbox.element_text.lower()
-                    elif text_match_type == "contains":
-                        text_match = req_text.lower() in bbox.element_text.lower()
-                    elif text_match_type == "startswith":
-                        text_match = bbox.element_text.lower().startswith(req_text.lower())
-                    elif text_match_type == "endswith":
-                        text_match = bbox.element_text.lower().endswith(req_text.lower())
-                elif not req_text:  # If no text requirement, consider it a match
-                    text_match = True
-                
-                # Confidence threshold check
-                confidence_match = bbox.confidence >= min_confidence
-                
-                if type_match and text_match and confidence_match:
-                    match_details = f"type: '{bbox.element_type}', text: '{bbox.element_text}'"
-                    required_details = f"required type: '{req_type}', required text: '{req_text}'"
-                    logger.info(f"Found matching element: {match_details} matches {required_details}")
-                    matched = True
-                    matching_bbox = bbox
-                    break
+            min_confidence = required.min_confidence
+            
+            # Try to find a matching element among those of the required type
+            matching_bbox = None
+            skipped_low_confidence = False
+            candidates = entries if required.scan_all else by_type.get(required.type, ())
+            for bbox, text_lower in candidates:
+                if required.matches(text_lower):
+                    if bbox.confidence >= min_confidence:
+                        logger.info("Found matching element: type: '%s', text: '%s' matches "
+                                    "required type: '%s', required text: '%s'",
+                                    bbox.element_type, bbox.element_text, required.type, required.text)
+                        matching_bbox = bbox
+                        break
+                    skipped_low_confidence = True
             
             # If any required element is not found, the state doesn't match
-            if not matched:
-                logger.debug(f"Required element not found: {required}")
+            if matching_bbox is None:
+                logger.debug("Required element not found: %s", required.source)
                 return None
+            
+            # This is also the first text match, so a click target with the same
+            # type and text can reuse it instead of scanning again
+            if not skipped_low_confidence:
+                matched[required.match_key] = matching_bbox
         
         # If we get here, all required elements were found and no excluded elements were found
         return matching_bbox
     
-    def _identify_current_state(self, bounding_boxes: List[BoundingBox]) -> str:
+    def _identify_current_state(self, bounding_boxes: List[BoundingBox],
+                                frame: Optional[_Frame] = None) -> str:
         """
         Identify the current UI state based on detected elements, using a sequential approach.
         First checks possible next states, then current state, then all states as fallback.
+        
+        Frames with the same elements as a recent one reuse its result, since
+        polling an unchanged screen detects the same elements again.
+        """
+        # Only type, text and confidence take part in state matching, and only
+        # whether an element is present, so detection order and duplicates don't matter
+        fingerprint = (self.current_state,
+                       frozenset([(bbox.element_type, bbox.element_text, bbox.confidence) for bbox in bounding_boxes]))
+        state_cache = self._state_cache
+        cached_state = state_cache.get(fingerprint)
+        if cached_state is not None:
+            logger.info("Same UI elements as a recent frame, reusing state: %s", cached_state)
+            return cached_state
+        
+        state = self._scan_for_state(bounding_boxes, frame)
+        
+        state_cache[fingerprint] = state
+        if len(state_cache) > self.STATE_CACHE_SIZE:
+            del state_cache[next(iter(state_cache))]
+        return state
+    
+    def _scan_for_state(self, bounding_boxes: List[BoundingBox],
+                        frame: Optional[_Frame] = None) -> str:
+        """
+        Check the state definitions against detected elements.
+        
+        Args:
+            bounding_boxes: List of detected UI elements
+            frame: Prepared frame index; built from bounding_boxes if not given
+        
+        Returns:
+            Name of the matched state, or "unknown"
         """
+        # Prepare the elements once for every state checked below
+        if frame is None:
+            frame = self._prepare_frame(bounding_boxes)
+        
         # 1. FIRST: Check states we can directly transition to from current state
-        possible_next_states = []
-        for transition_key in self.transitions:
-            if transition_key.startswith(f"{self.current_state}->"):
-                next_state = transition_key.split("->")[1]
-                possible_next_states.append(next_state)
+        possible_next_states = self._outgoing.get(self.current_state, ())
         
         # Check these next states first (most likely states)
+        state_specs = self._state_specs
         for state_name in possible_next_states:
-            state_def = self.states.get(state_name, {})
-            if self._find_matching_element(state_def, bounding_boxes):
-                logger.info(f"Found matching next state: {state_name}")
+            if self._match_state(state_specs.get(state_name, _EMPTY_STATE), bounding_boxes, frame):
+                logger.info("Found matching next state: %s", state_name)
                 return state_name
         
         # 2. SECOND: Check if we're still in current state
-        current_state_def = self.states.get(self.current_state, {})
-        if self._find_matching_element(current_state_def, bounding_boxes):
-            logger.info(f"Still in current state: {self.current_state}")
+        if self._match_state(state_specs.get(self.current_state, _EMPTY_STATE), bounding_boxes, frame):
+            logger.info("Still in current state: %s", self.current_state)
             return self.current_state
         
         # 3. THIRD: As fallback, check all states (for recovery from unexpected situations)
         logger.info("No expected state matched, checking all states as fallback")
-        for state_name, state_def in self.states.items():
+        for state_name, spec in state_specs.items():
             # Skip states we already checked
             if state_name == self.current_state or state_name in possible_next_states:
                 continue
                 
-            if self._find_matching_element(state_def, bounding_boxes):
-                logger.info(f"Found unexpected state: {state_name}")
+            if self._match_state(spec, bounding_boxes, frame):
+                logger.info("Found unexpected state: %s", state_name)
                 return state_name
         
         # If no state matches, return unknown
@@ -221,13 +509,12 @@ class DecisionEngine:
             True if this appears to be benchmark results
         """
         # Look for elements that suggest benchmark results
-        result_keywords = ["result", "fps", "score", "performance", "benchmark", "complete", "average"]
+        search_keywords = self._RESULT_KEYWORDS_RE.search
         
         for bbox in bounding_boxes:
             if bbox.element_text:
-                lowercase_text = bbox.element_text.lower()
-                if any(keyword in lowercase_text for keyword in result_keywords):
-                    logger.info(f"Found likely benchmark result element: {bbox.element_text}")
+                if search_keywords(bbox.element_text.lower()):
+                    logger.info("Found likely benchmark result element: %s", bbox.element_text)
                     return True
         
         return False
@@ -256,7 +543,8 @@ class DecisionEngine:
     
     def _get_action_for_transition(self, from_state: str, 
                                  to_state: str, 
-                                 bounding_boxes: List[BoundingBox]) -> Dict[str, Any]:
+                                 bounding_boxes: List[BoundingBox],
+                                 frame: Optional[_Frame] = None) -> Dict[str, Any]:
         """
         Get the action required to transition from one state to another.
         
@@ -264,125 +552,101 @@ class DecisionEngine:
             from_state: Current state name
             to_state: Target state name
             bounding_boxes: List of detected UI elements
+            frame: Prepared frame index; built from bounding_boxes if not given
         
         Returns:
             Action dictionary or empty dict if no action found
         """
         # Find the transition definition
-        transition_key = f"{from_state}->{to_state}"
-        transition = self.transitions.get(transition_key)
+        spec = self._transition_by_pair.get((from_state, to_state))
         
-        if not transition:
-            logger.warning(f"No transition defined for {transition_key}")
+        if spec is None:
+            logger.warning("No transition defined for %s->%s", from_state, to_state)
             return {}
         
         # Record this transition
-        self.transitions_taken.add(transition_key)
-        
-        # Get the action type
-        action_type = transition.get("action", "")
+        self.transitions_taken.add(spec.transition_key)
         
         # Check if there are hardcoded coordinates for this transition
-        if "hardcoded_coords" in transition:
-            coords = transition.get("hardcoded_coords", {})
-            x = coords.get("x", 0)
-            y = coords.get("y", 0)
+        if spec.hardcoded is not None:
+            logger.info("Using hardcoded coordinates: (%s, %s) for transition %s",
+                        spec.hardcoded["x"], spec.hardcoded["y"], spec.transition_key)
+            return dict(spec.hardcoded)
+        
+        # Dispatch on the action type
+        handler = self._ACTION_HANDLERS.get(spec.action)
+        if handler is None:
+            logger.warning("Unknown action type: %s", spec.action)
+            return {}
+        return handler(self, spec, from_state, to_state, bounding_boxes, frame)
+    
+    def _click_action(self, spec: _TransitionSpec, from_state: str, to_state: str,
+                      bounding_boxes: List[BoundingBox],
+                      frame: Optional[_Frame]) -> Dict[str, Any]:
+        """Build a click on the transition's target element, or its fallback coordinates."""
+        target = spec.target
+        
+        # Reuse the element found for an identical requirement while identifying
+        # the state, otherwise look among the elements of the target type
+        if frame is None:
+            frame = self._prepare_frame(bounding_boxes)
+        bbox = frame.matched.get(target.match_key)
+        if bbox is None:
+            candidates = frame.entries if target.scan_all else frame.by_type.get(target.type, ())
+            bbox = next((bbox for bbox, text_lower in candidates if target.matches(text_lower)), None)
+        
+        if bbox is not None:
+            # Click the center of the element
+            center_x, center_y = bbox.center
             
-            logger.info(f"Using hardcoded coordinates: ({x}, {y}) for transition {transition_key}")
+            logger.info("Action: Click at (%s, %s) on %s", center_x, center_y, bbox.element_type)
             return {
                 "type": "click",
-                "x": x,
-                "y": y
+                "x": center_x,
+                "y": center_y
             }
         
-        # Handle different action types
-        if action_type == "click":
-            # Find the element to click
-            target_element = transition.get("target", {})
-            element_type = target_element.get("type", "any")
-            element_text = target_element.get("text", "")
-            text_match_type = target_element.get("text_match", "exact")
-            
-            # Look for a matching element with the improved matching strategy
-            for bbox in bounding_boxes:
-                # Type matching - handle "any" type
-                type_match = (element_type == "any" or 
-                             not element_type or 
-                             bbox.element_type == element_type)
-                
-                # Text matching with different strategies
-                text_match = False
-                if bbox.element_text and element_text:
-                    if text_match_type == "exact":
-                        text_match = element_text.lower() == bbox.element_text.lower()
-                    elif text_match_type == "contains":
-                        text_match = element_text.lower() in bbox.element_text.lower()
-                    elif text_match_type == "startswith":
-                        text_match = bbox.element_text.lower().startswith(element_text.lower())
-                    elif text_match_type == "endswith":
-                        text_match = bbox.element_text.lower().endswith(element_text.lower())
-                elif not element_text:  # If no text requirement, consider it a match
-                    text_match = True
-                
-                if type_match and text_match:
-                    # Calculate center point for click
-                    center_x = bbox.x + (bbox.width // 2)
-                    center_y = bbox.y + (bbox.height // 2)
-                    
-                    logger.info(f"Action: Click at ({center_x}, {center_y}) on {bbox.element_type}")
-                    return {
-                        "type": "click",
-                        "x": center_x,
-                        "y": center_y
-                    }
-            
-            # If we're here, we couldn't find a matching element
-            logger.warning(f"Could not find matching element for click in transition {transition_key}")
+        # If we're here, we couldn't find a matching element
+        logger.warning("Could not find matching element for click in transition %s", spec.transition_key)
+        
+        # Check for fallback coordinates
+        if spec.fallback is not None:
+            logger.info("Using fallback coordinates: (%s, %s) for transition %s",
+                        spec.fallback["x"], spec.fallback["y"], spec.transition_key)
+            return dict(spec.fallback)
             
-            # Check for fallback coordinates
-            fallback_coords = transition.get("fallback_coords", {})
-            if fallback_coords:
-                x = fallback_coords.get("x", 0)
-                y = fallback_coords.get("y", 0)
-                logger.info(f"Using fallback coordinates: ({x}, {y}) for transition {transition_key}")
-                return {
-                    "type": "click",
-                    "x": x,
-                    "y": y
-                }
-                
+        return {}
+    
+    def _key_action(self, spec: _TransitionSpec, from_state: str, to_state: str,
+                    bounding_boxes: List[BoundingBox],
+                    frame: Optional[_Frame]) -> Dict[str, Any]:
+        """Build a key press action."""
+        if spec.key_action is not None:
+            logger.info("Action: Press key %s", spec.key_action["key"])
+            return dict(spec.key_action)
+        else:
+            logger.warning("Key action specified but no key provided")
             return {}
+    
+    def _wait_action(self, spec: _TransitionSpec, from_state: str, to_state: str,
+                     bounding_boxes: List[BoundingBox],
+                     frame: Optional[_Frame]) -> Dict[str, Any]:
+        """Build a wait action."""
+        logger.info("Action: Wait for %s seconds", spec.wait_action["duration"])
+        
+        # If this is the benchmark running wait, set the context flag
+        if from_state == "benchmark_running" or to_state == "benchmark_complete":
+            self.state_context["in_benchmark"] = True
+            logger.info("Setting in_benchmark context flag to True")
             
-        elif action_type == "key":
-            # Key press action
-            key = transition.get("key", "")
-            if key:
-                logger.info(f"Action: Press key {key}")
-                return {
-                    "type": "key",
-                    "key": key
-                }
-            else:
-                logger.warning("Key action specified but no key provided")
-                return {}
-                
-        elif action_type == "wait":
-            # Wait action
-            duration = transition.get("duration", 1)
-            logger.info(f"Action: Wait for {duration} seconds")
-            
-            # If this is the benchmark running wait, set the context flag
-            if from_state == "benchmark_running" or to_state == "benchmark_complete":
-                self.state_context["in_benchmark"] = True
-                logger.info("Setting in_benchmark context flag to True")
-                
-            return {
-                "type": "wait",
-                "duration": duration
-            }
-        
-        logger.warning(f"Unknown action type: {action_type}")
-        return {}
+        return dict(spec.wait_action)
+    
+    # Transition action type -> method building the action
+    _ACTION_HANDLERS = {
+        "click": _click_action,
+        "key": _key_action,
+        "wait": _wait_action,
+    }
     
     def _select_next_state(self, current_state: str) -> str:
         """
@@ -395,23 +659,19 @@ class DecisionEngine:
             Next state name or empty string if no valid transition
         """
         # Find possible next states from the current state
-        possible_transitions = []
-        for transition_key in self.transitions:
-            if transition_key.startswith(f"{current_state}->"):
-                target_state = transition_key.split("->")[1]
-                possible_transitions.append(target_state)
+        possible_transitions = self._outgoing.get(current_state, ())
         
         if not possible_transitions:
-            logger.warning(f"No transitions defined from state {current_state}")
+            logger.warning("No transitions defined from state %s", current_state)
             return ""
         
         # Apply context-aware selection if we have multiple options
         if len(possible_transitions) > 1:
-            # Prefer states we haven't visited yet
-            unvisited = [s for s in possible_transitions if s not in self.visited_states]
-            if unvisited:
-                selected = unvisited[0]
-                logger.info(f"Selected unvisited state: {selected}")
+            # Prefer states we haven't visited yet; only the first one is needed
+            visited_states = self.visited_states
+            selected = next((s for s in possible_transitions if s not in visited_states), None)
+            if selected is not None:
+                logger.info("Selected unvisited state: %s", selected)
                 return selected
                 
             # If all have been visited, use other heuristics
@@ -419,7 +679,7 @@ class DecisionEngine:
         
         # Default to first option
         selected = possible_transitions[0]
-        logger.info(f"Selected next state: {selected}")
+        logger.info("Selected next state: %s", selected)
         return selected
     
     def get_fallback_action(self, current_state: str) -> Dict[str, Any]:
@@ -435,7 +695,7 @@ class DecisionEngine:
         # Check for state-specific fallback
         state_fallback = self.fallbacks.get(current_state, None)
         if state_fallback:
-            logger.info(f"Using state-specific fallback for {current_state}")
+            logger.info("Using state-specific fallback for %s", current_state)
             return state_fallback
         
         # Use general fallback
@@ -446,7 +706,7 @@ class DecisionEngine:
         
         # Default to Escape key
         logger.info("Using default escape key fallback")
-        return {"type": "key", "key": "escape"}
+        return dict(self._ESCAPE_ACTION)
     
     def determine_next_action(self, current_state: str, 
                             bounding_boxes: List[BoundingBox]) -> Tuple[Dict[str, Any], str]:
@@ -465,14 +725,16 @@ class DecisionEngine:
             self.state_history.append(current_state)
             self.visited_states.add(current_state)
             self.state_start_times[current_state] = time.time()
-            logger.info(f"Updated state history: {' -> '.join(self.state_history)}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Updated state history: %s", " -> ".join(self.state_history))
         
         # Verify the current state by checking UI elements
-        verified_state = self._identify_current_state(bounding_boxes)
+        frame = self._prepare_frame(bounding_boxes)
+        verified_state = self._identify_current_state(bounding_boxes, frame)
         
         # If the verified state doesn't match the expected current state, use the verified one
         if verified_state != "unknown" and verified_state != current_state:
-            logger.info(f"State mismatch: expected {current_state}, found {verified_state}")
+            logger.info("State mismatch: expected %s, found %s", current_state, verified_state)
             current_state = verified_state
             # Update history with the corrected state
             if self.state_history and self.state_history[-1] != current_state:
@@ -482,7 +744,7 @@ class DecisionEngine:
         
         # Check if we've reached the target state
         if current_state == self.target_state:
-            logger.info(f"Reached target state: {self.target_state}")
+            logger.info("Reached target state: %s", self.target_state)
             return {}, current_state
         
         # Select the next state to transition to
@@ -494,18 +756,18 @@ class DecisionEngine:
             # Fallback behavior: try "initial" state if we're stuck
             if current_state != "initial" and verified_state == "unknown":
                 logger.info("Falling back to initial state since no UI elements were recognized")
-                return {"type": "wait", "duration": 3}, "initial"
+                return dict(self._WAIT_FOR_INITIAL_ACTION), "initial"
                 
             # Another fallback: try to press escape key
             if current_state == "unknown" or verified_state == "unknown":
                 fallback_action = self.get_fallback_action(current_state)
-                logger.info(f"Using fallback action for unknown state: {fallback_action}")
+                logger.info("Using fallback action for unknown state: %s", fallback_action)
                 return fallback_action, current_state
                 
             return {}, current_state
         
         # Get the action for this transition
-        action = self._get_action_for_transition(current_state, next_state, bounding_boxes)
+        action = self._get_action_for_transition(current_state, next_state, bounding_boxes, frame)
         
         # Track benchmark timing
         self.track_benchmark_timing(current_state, next_state)
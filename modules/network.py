@@ -26,6 +26,9 @@ class NetworkManager:
         self.sut_port = sut_port
         self.base_url = f"http://{sut_ip}:{sut_port}"
         self.session = requests.Session()
+        # Set when a cached manager is handed to a new run; if its first request
+        # finds the pooled session stale, the session is replaced
+        self._reconnect_on_failure = False
         logger.info(f"NetworkManager initialized with SUT at {self.base_url}")
         
         # Verify connection
@@ -54,6 +57,44 @@ class NetworkManager:
             logger.error(f"Connection check failed: {str(e)}")
             raise ConnectionError(f"Cannot connect to SUT at {self.base_url}: {str(e)}")
     
+    def mark_reused(self):
+        """Reconnect once if the next request fails with a connection error."""
+        self._reconnect_on_failure = True
+    
+    def _request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """
+        Send a request over the session, reconnecting once on first use after reuse.
+        
+        Only GETs are sent again on the fresh session. A POST (action or launch)
+        may already have reached the SUT, so its error is raised after reconnecting
+        rather than risk performing it twice.
+        
+        Args:
+            method: HTTP method
+            path: URL path on the SUT
+            **kwargs: Passed through to requests
+        
+        Returns:
+            The response
+        
+        Raises:
+            RequestException: If the request fails
+        """
+        url = f"{self.base_url}{path}"
+        try:
+            return self.session.request(method, url, **kwargs)
+        except requests.ConnectionError as e:
+            if not self._reconnect_on_failure:
+                raise
+            logger.info(f"Reused SUT session failed ({str(e)}), reconnecting")
+            self.session.close()
+            self.session = requests.Session()
+            if method != "GET":
+                raise
+            return self.session.request(method, url, **kwargs)
+        finally:
+            self._reconnect_on_failure = False
+    
     def send_action(self, action: Dict[str, Any]) -> Dict[str, Any]:
         """
         Send an action command to the SUT.
@@ -69,8 +110,8 @@ class NetworkManager:
             RequestException: If the request fails
         """
         try:
-            response = self.session.post(
-                f"{self.base_url}/action",
+            response = self._request(
+                "POST", "/action",
                 json=action,
                 timeout=10
             )
@@ -82,19 +123,26 @@ class NetworkManager:
             logger.error(f"Failed to send action {action}: {str(e)}")
             raise
     
-    def get_screenshot(self) -> bytes:
+    def get_screenshot(self, image_format: str = "png", quality: int = 85) -> bytes:
         """
         Request a screenshot from the SUT.
         
+        Args:
+            image_format: "png" or "jpeg"; JPEG is much smaller and faster to encode
+            quality: JPEG quality (ignored for PNG)
+        
         Returns:
             Raw screenshot data as bytes
         
         Raises:
             RequestException: If the request fails
         """
+        # PNG is the SUT default, so older services that don't know the parameter still work
+        params = {"format": image_format, "quality": quality} if image_format != "png" else None
         try:
-            response = self.session.get(
-                f"{self.base_url}/screenshot",
+            response = self._request(
+                "GET", "/screenshot",
+                params=params,
                 timeout=15
             )
             response.raise_for_status()
@@ -118,8 +166,8 @@ class NetworkManager:
             RequestException: If the request fails
         """
         try:
-            response = self.session.post(
-                f"{self.base_url}/launch",
+            response = self._request(
+                "POST", "/launch",
                 json={"path": game_path},
                 timeout=30
             )
@@ -79,46 +79,42 @@ class OmniparserClient:
         logger.info(f"Omniparser returned {len(parsed_content_list)} items in parsed_content_list")
         
         # Log first item as sample if available
-        if parsed_content_list and len(parsed_content_list) > 0:
-            logger.debug(f"First item example: {json.dumps(parsed_content_list[0], indent=2)}")
+        if parsed_content_list and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("First item example: %s", json.dumps(parsed_content_list[0], indent=2))
         
-        # Process each detected element
+        # Scale factors are looked up once rather than per element
+        screen_width, screen_height = self.screen_width, self.screen_height
+        
+        # Process each detected element, filtering before scaling so dropped elements cost nothing
         for i, element in enumerate(parsed_content_list):
             try:
                 # Process only elements that have bbox data
-                if 'bbox' in element:
-                    # Get normalized coordinates (0-1 range)
-                    bbox_coords = element['bbox']
-                    logger.debug(f"Element {i} bbox: {bbox_coords}")
-                    
-                    # Omniparser uses normalized coordinates [x1, y1, x2, y2]
-                    x1, y1, x2, y2 = bbox_coords
-                    
-                    # Convert normalized to absolute coordinates
-                    abs_x1 = int(x1 * self.screen_width)
-                    abs_y1 = int(y1 * self.screen_height)
-                    abs_x2 = int(x2 * self.screen_width)
-                    abs_y2 = int(y2 * self.screen_height)
-                    
-                    # Check for interactivity - prefer interactive elements
-                    is_interactive = element.get('interactivity', False)
-                    
-                    # Only include interactive elements if they have content
-                    if is_interactive and element.get('content'):
-                        # Create BoundingBox object
-                        bbox = BoundingBox(
-                            x=abs_x1,
-                            y=abs_y1,
-                            width=abs_x2 - abs_x1,
-                            height=abs_y2 - abs_y1,
-                            confidence=1.0,  # Set to 1.0 since Omniparser doesn't provide confidence
-                            element_type=element.get('type', 'unknown'),
-                            element_text=element.get('content', '')
-                        )
-                        bounding_boxes.append(bbox)
-                        logger.debug(f"Added interactive element: {element.get('content')}")
-                else:
-                    logger.debug(f"Element {i} has no bbox field, skipping")
+                if 'bbox' not in element:
+                    logger.debug("Element %d has no bbox field, skipping", i)
+                    continue
+                
+                # Only include interactive elements if they have content
+                content = element.get('content')
+                if not (element.get('interactivity', False) and content):
+                    continue
+                
+                # Omniparser uses normalized coordinates (0-1 range) [x1, y1, x2, y2]
+                x1, y1, x2, y2 = element['bbox']
+                
+                # Convert normalized to absolute coordinates
+                abs_x1 = int(x1 * screen_width)
+                abs_y1 = int(y1 * screen_height)
+                
+                bounding_boxes.append(BoundingBox(
+                    x=abs_x1,
+                    y=abs_y1,
+                    width=int(x2 * screen_width) - abs_x1,
+                    height=int(y2 * screen_height) - abs_y1,
+                    confidence=1.0,  # Set to 1.0 since Omniparser doesn't provide confidence
+                    element_type=element.get('type', 'unknown'),
+                    element_text=content
+                ))
+                logger.debug("Added interactive element: %s", content)
                     
             except (KeyError, ValueError, IndexError) as e:
                 logger.warning(f"Error parsing element {i}: {str(e)}")
@@ -152,12 +148,14 @@ class OmniparserClient:
         
         return "\n".join(formatted)
     
-    def detect_ui_elements(self, image_path: str) -> List[BoundingBox]:
+    def detect_ui_elements(self, image_path: str, image_data: bytes = None) -> List[BoundingBox]:
         """
         Send an image to Omniparser and get UI element detections.
         
         Args:
             image_path: Path to the screenshot image
+            image_data: Raw image bytes already in memory; when given the file
+                at image_path is not read and the path is only used for naming
         
         Returns:
             List of detected UI elements with bounding boxes
@@ -167,12 +165,15 @@ class OmniparserClient:
             ValueError: If the response cannot be parsed
         """
         try:
-            # Check if the image file exists
-            if not os.path.exists(image_path):
-                raise FileNotFoundError(f"Image file not found: {image_path}")
-            
-            # Encode the image
-            base64_image = self._encode_image(image_path)
+            # Encode the image, reading it from disk only if it isn't already in memory
+            if image_data is not None:
+                base64_image = base64.b64encode(image_data).decode('utf-8')
+            else:
+                # Check if the image file exists
+                if not os.path.exists(image_path):
+                    raise FileNotFoundError(f"Image file not found: {image_path}")
+                
+                base64_image = self._encode_image(image_path)
             
             # Prepare the payload for Omniparser
             payload = {
@@ -226,20 +227,23 @@ class OmniparserClient:
                     logger.warning(f"Failed to save annotated image: {str(e)}")
             
             # Log decision engine input data
-            logger.debug("=== DECISION ENGINE INPUT DATA ===")
-            logger.debug(f"Sending {len(bounding_boxes)} UI elements to decision engine:")
-            for i, bbox in enumerate(bounding_boxes):
-                logger.debug(f"  Element {i+1}:")
-                logger.debug(f"    Type: {bbox.element_type}")
-                logger.debug(f"    Text: '{bbox.element_text}'")
-                logger.debug(f"    Position: (x={bbox.x}, y={bbox.y}, w={bbox.width}, h={bbox.height})")
-            logger.debug("=== END OF DECISION ENGINE INPUT ===")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("=== DECISION ENGINE INPUT DATA ===")
+                logger.debug("Sending %d UI elements to decision engine:", len(bounding_boxes))
+                for i, bbox in enumerate(bounding_boxes, 1):
+                    logger.debug("  Element %d:", i)
+                    logger.debug("    Type: %s", bbox.element_type)
+                    logger.debug("    Text: '%s'", bbox.element_text)
+                    logger.debug("    Position: (x=%d, y=%d, w=%d, h=%d)",
+                                 bbox.x, bbox.y, bbox.width, bbox.height)
+                logger.debug("=== END OF DECISION ENGINE INPUT ===")
 
             # Log detected elements in compact format
-            formatted_boxes = self._format_bounding_boxes(bounding_boxes)
-            logger.info(f"Detected {len(bounding_boxes)} UI elements in {image_path}:")
-            for line in formatted_boxes.split('\n'):
-                logger.info(f"  {line}")
+            if logger.isEnabledFor(logging.INFO):
+                formatted_boxes = self._format_bounding_boxes(bounding_boxes)
+                logger.info("Detected %d UI elements in %s:", len(bounding_boxes), image_path)
+                for line in formatted_boxes.split('\n'):
+                    logger.info("  %s", line)
 
             return bounding_boxes
             
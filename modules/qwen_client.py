@@ -187,12 +187,14 @@ Respond ONLY with JSON and nothing else."""
         
         return "\n".join(formatted)
     
-    def detect_ui_elements(self, image_path: str) -> List[BoundingBox]:
+    def detect_ui_elements(self, image_path: str, image_data: bytes = None) -> List[BoundingBox]:
         """
         Send an image to Qwen VL and get UI element detections.
         
         Args:
             image_path: Path to the screenshot image
+            image_data: Raw image bytes already in memory; when given the file
+                at image_path is not read and the path is only used for naming
         
         Returns:
             List of detected UI elements with bounding boxes
@@ -202,12 +204,17 @@ Respond ONLY with JSON and nothing else."""
             ValueError: If the response cannot be parsed
         """
         try:
-            # Check if the image file exists
-            if not os.path.exists(image_path):
-                raise FileNotFoundError(f"Image file not found: {image_path}")
-            
-            # Encode the image
-            base64_image = self._encode_image(image_path)
+            # Encode the image, reading it from disk only if it isn't already in memory
+            if image_data is not None:
+                base64_image = base64.b64encode(image_data).decode('utf-8')
+            else:
+                # Check if the image file exists
+                if not os.path.exists(image_path):
+                    raise FileNotFoundError(f"Image file not found: {image_path}")
+                
+                base64_image = self._encode_image(image_path)
+            # JPEG data always base64-encodes to a "/9j/" prefix; anything else is sent as PNG
+            mime_type = "image/jpeg" if base64_image.startswith("/9j/") else "image/png"
             
             # Prepare the prompt with the image
             prompt = f"Analyze this game screenshot and identify all UI elements with exact coordinates."
@@ -220,7 +227,7 @@ Respond ONLY with JSON and nothing else."""
                     {"role": "user", "content": [
                         {"type": "text", "text": prompt},
                         {"type": "image_url", 
-                         "image_url": {"url": f"data:image/png;base64,{base64_image}"}}
+                         "image_url": {"url": f"data:{mime_type};base64,{base64_image}"}}
                     ]}
                 ],
                 "temperature": 0.01,  # Very low temperature for consistent results
@@ -273,13 +280,14 @@ Respond ONLY with JSON and nothing else."""
                             )
                             bounding_boxes.append(bbox)
                     except KeyError as e:
-                        logger.warning(f"Missing key in element data: {e}, skipping this element")
+                        logger.warning("Missing key in element data: %s, skipping this element", e)
                 
                 # Log detected elements in a human-readable format
-                formatted_boxes = self._format_bounding_boxes(bounding_boxes)
-                logger.info(f"Detected {len(bounding_boxes)} UI elements in {image_path}:")
-                for line in formatted_boxes.split('\n'):
-                    logger.info(f"  {line}")
+                if logger.isEnabledFor(logging.INFO):
+                    formatted_boxes = self._format_bounding_boxes(bounding_boxes)
+                    logger.info("Detected %d UI elements in %s:", len(bounding_boxes), image_path)
+                    for line in formatted_boxes.split('\n'):
+                        logger.info("  %s", line)
                 
                 return bounding_boxes
             else:
@@ -14,15 +14,22 @@ logger = logging.getLogger(__name__)
 class ScreenshotManager:
     """Manages screenshot operations."""
     
-    def __init__(self, network_manager: NetworkManager):
+    # Output directories already created, so makedirs runs once per directory rather than per save;
+    # a directory removed later is recreated when writing into it fails
+    _ensured_dirs = set()
+    
+    def __init__(self, network_manager: NetworkManager, image_format: str = "png"):
         """
         Initialize the screenshot manager.
         
         Args:
             network_manager: NetworkManager instance for communication with SUT
+            image_format: Format requested from the SUT, "png" (default) or "jpeg"
         """
         self.network_manager = network_manager
-        logger.info("ScreenshotManager initialized")
+        self.image_format = "jpeg" if image_format.lower() in ("jpeg", "jpg") else "png"
+        self.file_extension = ".jpg" if self.image_format == "jpeg" else ".png"
+        logger.info(f"ScreenshotManager initialized (format: {self.image_format})")
     
     def capture(self, output_path: str) -> bool:
         """
@@ -42,7 +49,7 @@ class ScreenshotManager:
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
             
             # Get screenshot from the SUT
-            screenshot_data = self.network_manager.get_screenshot()
+            screenshot_data = self.network_manager.get_screenshot(self.image_format)
             
             # Save the screenshot
             with open(output_path, 'wb') as f:
@@ -55,6 +62,60 @@ class ScreenshotManager:
             logger.error(f"Failed to capture or save screenshot: {str(e)}")
             raise IOError(f"Screenshot capture failed: {str(e)}")
     
+    def capture_bytes(self) -> bytes:
+        """
+        Capture a screenshot from the SUT and return it without writing to disk.
+        
+        Returns:
+            Raw screenshot data as bytes
+        
+        Raises:
+            IOError: If there's an error capturing the screenshot
+        """
+        try:
+            screenshot_data = self.network_manager.get_screenshot(self.image_format)
+            logger.debug(f"Screenshot captured in memory ({len(screenshot_data)} bytes)")
+            return screenshot_data
+            
+        except Exception as e:
+            logger.error(f"Failed to capture screenshot: {str(e)}")
+            raise IOError(f"Screenshot capture failed: {str(e)}")
+    
+    def save(self, output_path: str, screenshot_data: bytes) -> bool:
+        """
+        Save screenshot bytes obtained from capture_bytes to the specified path.
+        
+        Args:
+            output_path: Path where the screenshot should be saved
+            screenshot_data: Raw screenshot data
+        
+        Returns:
+            True if the screenshot was successfully saved
+        
+        Raises:
+            IOError: If there's an error saving the screenshot
+        """
+        try:
+            output_dir = os.path.dirname(output_path)
+            if output_dir not in self._ensured_dirs:
+                os.makedirs(output_dir, exist_ok=True)
+                self._ensured_dirs.add(output_dir)
+            try:
+                f = open(output_path, 'wb')
+            except FileNotFoundError:
+                # The directory was deleted after it was first created
+                os.makedirs(output_dir, exist_ok=True)
+                f = open(output_path, 'wb')
+            with f:
+                f.write(screenshot_data)
+            
+            logger.info(f"Screenshot saved to {output_path}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to save screenshot: {str(e)}")
+            raise IOError(f"Screenshot save failed: {str(e)}")
+    
     def capture_region(self, output_path: str, x: int, y: int, width: int, height: int) -> bool:
         """
         Capture a specific region of the screen from the SUT.
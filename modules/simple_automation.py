@@ -16,8 +16,13 @@ logger = logging.getLogger(__name__)
 class SimpleAutomation:
     """Fully modular step-by-step automation with comprehensive action support."""
     
-    def __init__(self, config_path, network, screenshot_mgr, vision_model, stop_event=None, run_dir=None, annotator=None):
-        """Initialize with all necessary components."""
+    def __init__(self, config_path, network, screenshot_mgr, vision_model, stop_event=None, run_dir=None, annotator=None, config=None):
+        """
+        Initialize with all necessary components.
+        
+        If the caller already parsed the configuration it can pass it via
+        `config` to avoid loading the YAML file a second time.
+        """
         self.config_path = config_path
         self.network = network
         self.screenshot_mgr = screenshot_mgr
@@ -26,15 +31,19 @@ class SimpleAutomation:
         self.annotator = annotator
         
         # Load configuration
-        try:
-            from modules.simple_config_parser import SimpleConfigParser
-            config_parser = SimpleConfigParser(config_path)
-            self.config = config_parser.get_config()
-            logger.info("Using SimpleConfigParser for step-based configuration")
-        except (ImportError, ValueError):
-            logger.info("SimpleConfigParser not available, loading YAML directly")
-            with open(config_path, 'r') as f:
-                self.config = yaml.safe_load(f)
+        if config is not None:
+            self.config = config
+            logger.info("Using pre-parsed step-based configuration")
+        else:
+            try:
+                from modules.simple_config_parser import SimpleConfigParser
+                config_parser = SimpleConfigParser(config_path)
+                self.config = config_parser.get_config()
+                logger.info("Using SimpleConfigParser for step-based configuration")
+            except (ImportError, ValueError):
+                logger.info("SimpleConfigParser not available, loading YAML directly")
+                with open(config_path, 'r') as f:
+                    self.config = yaml.safe_load(f)
         
         # Game metadata with enhanced support
         self.game_name = self.config.get("metadata", {}).get("game_name", "Unknown Game")
@@ -94,9 +103,11 @@ class SimpleAutomation:
                 continue
             
             # Capture screenshot
-            screenshot_path = f"{self.run_dir}/screenshots/screenshot_{current_step}.png"
+            screenshot_path = f"{self.run_dir}/screenshots/screenshot_{current_step}{self.screenshot_mgr.file_extension}"
             try:
-                self.screenshot_mgr.capture(screenshot_path)
+                # Keep the bytes so detection and annotation don't re-read the file
+                screenshot_data = self.screenshot_mgr.capture_bytes()
+                self.screenshot_mgr.save(screenshot_path, screenshot_data)
             except Exception as e:
                 logger.error(f"Failed to capture screenshot: {str(e)}")
                 retries += 1
@@ -106,7 +117,7 @@ class SimpleAutomation:
             
             # Detect UI elements
             try:
-                bounding_boxes = self.vision_model.detect_ui_elements(screenshot_path)
+                bounding_boxes = self.vision_model.detect_ui_elements(screenshot_path, image_data=screenshot_data)
             except Exception as e:
                 logger.error(f"Failed to detect UI elements: {str(e)}")
                 retries += 1
@@ -118,7 +129,7 @@ class SimpleAutomation:
             if self.annotator:
                 try:
                     annotated_path = f"{self.run_dir}/annotated/annotated_{current_step}.png"
-                    self.annotator.draw_bounding_boxes(screenshot_path, bounding_boxes, annotated_path)
+                    self.annotator.draw_bounding_boxes(screenshot_path, bounding_boxes, annotated_path, image_data=screenshot_data)
                 except Exception as e:
                     logger.warning(f"Failed to create annotated screenshot: {str(e)}")
             
@@ -251,8 +262,7 @@ class SimpleAutomation:
         element_info = "unknown element"
         if target_element:
             element_info = f"'{target_element.element_text}'" if target_element.element_text else f"{target_element.element_type} element"
-            x = target_element.x + (target_element.width // 2)
-            y = target_element.y + (target_element.height // 2)
+            x, y = target_element.center
         else:
             x = action_config.get("x", 0)
             y = action_config.get("y", 0)
@@ -396,8 +406,7 @@ class SimpleAutomation:
         element_info = "unknown element"
         if target_element:
             element_info = f"'{target_element.element_text}'" if target_element.element_text else f"{target_element.element_type} element"
-            x = target_element.x + (target_element.width // 2)
-            y = target_element.y + (target_element.height // 2)
+            x, y = target_element.center
         else:
             x = action_config.get("x", 0)
             y = action_config.get("y", 0)
@@ -453,8 +462,7 @@ class SimpleAutomation:
         
         # Source element information
         source_info = f"'{target_element.element_text}'" if target_element.element_text else f"{target_element.element_type} element"
-        source_x = target_element.x + (target_element.width // 2)
-        source_y = target_element.y + (target_element.height // 2)
+        source_x, source_y = target_element.center
         
         # Destination coordinates
         dest_x = action_config.get("dest_x", source_x + 100)
@@ -486,8 +494,7 @@ class SimpleAutomation:
         # Get scroll location
         if target_element:
             element_info = f"'{target_element.element_text}'" if target_element.element_text else f"{target_element.element_type} element"
-            x = target_element.x + (target_element.width // 2)
-            y = target_element.y + (target_element.height // 2)
+            x, y = target_element.center
         else:
             x = action_config.get("x", 500)  # Default center screen
             y = action_config.get("y", 400)
@@ -573,10 +580,11 @@ class SimpleAutomation:
             return False
         
         try:
-            # Capture current screenshot for optional step checking
-            optional_screenshot = f"{self.run_dir}/screenshots/optional_check.png"
-            self.screenshot_mgr.capture(optional_screenshot)
-            optional_boxes = self.vision_model.detect_ui_elements(optional_screenshot)
+            # Capture current screenshot for optional step checking; it is only a scratch
+            # image that was overwritten on every check, so it stays in memory
+            optional_screenshot = f"{self.run_dir}/screenshots/optional_check{self.screenshot_mgr.file_extension}"
+            optional_data = self.screenshot_mgr.capture_bytes()
+            optional_boxes = self.vision_model.detect_ui_elements(optional_screenshot, image_data=optional_data)
             
             # Check each optional step
             for step_name, step_config in self.optional_steps.items():
@@ -602,10 +610,12 @@ class SimpleAutomation:
     def _interruptible_wait(self, duration: int):
         """Wait that can be interrupted by stop event."""
         for i in range(duration):
-            if self.stop_event and self.stop_event.is_set():
-                logger.info("Wait interrupted by stop event")
-                break
-            time.sleep(1)
+            if self.stop_event:
+                if self.stop_event.wait(1):
+                    logger.info("Wait interrupted by stop event")
+                    break
+            else:
+                time.sleep(1)
             if i % 10 == 0 and i > 0:
                 logger.info(f"Still waiting... {i}/{duration} seconds elapsed")
     
@@ -657,15 +667,16 @@ class SimpleAutomation:
         """Verify step success with enhanced checking."""
         logger.info("Verifying step success...")
         
-        verify_path = f"{self.run_dir}/screenshots/verify_{step_num}.png"
+        verify_path = f"{self.run_dir}/screenshots/verify_{step_num}{self.screenshot_mgr.file_extension}"
         try:
-            self.screenshot_mgr.capture(verify_path)
-            verify_boxes = self.vision_model.detect_ui_elements(verify_path)
+            verify_data = self.screenshot_mgr.capture_bytes()
+            self.screenshot_mgr.save(verify_path, verify_data)
+            verify_boxes = self.vision_model.detect_ui_elements(verify_path, image_data=verify_data)
             
             if self.annotator:
                 try:
                     annotated_verify_path = f"{self.run_dir}/annotated/verify_{step_num}.png"
-                    self.annotator.draw_bounding_boxes(verify_path, verify_boxes, annotated_verify_path)
+                    self.annotator.draw_bounding_boxes(verify_path, verify_boxes, annotated_verify_path, image_data=verify_data)
                 except Exception as e:
                     logger.warning(f"Failed to create verification annotation: {str(e)}")
             
@@ -7,6 +7,8 @@ import yaml
 import logging
 from typing import Dict, Any, List, Optional
 
+from modules.yaml_cache import load_yaml, is_validated, mark_validated
+
 logger = logging.getLogger(__name__)
 
 class SimpleConfigParser:
@@ -24,8 +26,15 @@ class SimpleConfigParser:
             ValueError: If the config file is invalid
         """
         self.config_path = config_path
+        self._config_key = None
         self.config = self._load_config()
-        self._validate_config()
+        # An unchanged file that validated before doesn't need validating again
+        # (its warnings were logged the first time)
+        if is_validated(self._config_key, __name__):
+            logger.debug(f"Configuration {self.config_path} already validated")
+        else:
+            self._validate_config()
+            mark_validated(self._config_key, __name__)
         
         # Extract basic metadata
         self.game_name = self.config.get("metadata", {}).get("game_name", "Unknown Game")
@@ -47,8 +56,7 @@ class SimpleConfigParser:
             raise FileNotFoundError(f"Config file not found: {self.config_path}")
         
         try:
-            with open(self.config_path, 'r') as f:
-                config = yaml.safe_load(f)
+            config, self._config_key = load_yaml(self.config_path)
             
             logger.info(f"Loaded configuration from {self.config_path}")
             return config
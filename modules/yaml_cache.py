@@ -0,0 +1,119 @@
+"""
+Cache of parsed YAML configuration files.
+
+Configs are keyed by absolute path, modification time and size, so a file
+is parsed again only after it changes on disk. Each entry also records which
+validators have accepted that version of the file; the record is evicted
+with the entry.
+"""
+
+import os
+import copy
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Tuple
+
+import yaml
+
+# Use the libyaml C loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of parsed configs kept in memory
+CACHE_SIZE = 32
+
+# key -> (parsed YAML, names of validators that accepted it)
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def file_key(path: str) -> Tuple[str, int, int]:
+    """
+    Build the cache key for a file.
+
+    Args:
+        path: Path to the file
+
+    Returns:
+        Tuple of (absolute path, mtime in ns, size in bytes)
+
+    Raises:
+        FileNotFoundError: If the file doesn't exist
+    """
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_mtime_ns, stat.st_size
+
+
+def load_yaml(path: str) -> Tuple[Any, Tuple[str, int, int]]:
+    """
+    Load a YAML file, reusing the parsed result while the file is unchanged.
+
+    Each caller gets its own deep copy, so modifying the returned config
+    does not affect the cache.
+
+    Args:
+        path: Path to the YAML file
+
+    Returns:
+        Tuple of (parsed YAML, cache key of the file)
+
+    Raises:
+        FileNotFoundError: If the file doesn't exist
+        yaml.YAMLError: If the YAML is invalid
+    """
+    key = file_key(path)
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None:
+            _cache.move_to_end(key)
+
+    if entry is None:
+        # Bytes go straight to the loader, which detects the encoding itself
+        with open(path, 'rb') as f:
+            entry = (yaml.load(f, Loader=_YamlLoader), set())
+        with _lock:
+            _cache[key] = entry
+            if len(_cache) > CACHE_SIZE:
+                _cache.popitem(last=False)
+    else:
+        logger.debug(f"Using cached configuration for {path}")
+
+    return copy.deepcopy(entry[0]), key
+
+
+def is_validated(key: Tuple[str, int, int], validator: str) -> bool:
+    """
+    Check whether a validator already accepted the cached version of a file.
+
+    Args:
+        key: Cache key returned by load_yaml
+        validator: Name of the validator
+
+    Returns:
+        True if the file is still cached and the validator accepted it
+    """
+    with _lock:
+        entry = _cache.get(key)
+        return entry is not None and validator in entry[1]
+
+
+def mark_validated(key: Tuple[str, int, int], validator: str) -> None:
+    """
+    Record that a validator accepted the cached version of a file.
+
+    Does nothing if the entry has been evicted, so the file is simply
+    validated again next time.
+
+    Args:
+        key: Cache key returned by load_yaml
+        validator: Name of the validator
+    """
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None:
+            entry[1].add(validator)
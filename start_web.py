@@ -365,7 +365,7 @@ def run_simple_automation(config_parser, config, settings):
         
         # Initialize components
         network = NetworkManager(settings['sut_ip'], int(settings['sut_port']))
-        screenshot_mgr = ScreenshotManager(network)
+        screenshot_mgr = ScreenshotManager(network, image_format=config.get("metadata", {}).get("screenshot_format", "png"))
         
         # Initialize vision model
         if settings['vision_model'] == 'gemma':
@@ -406,7 +406,8 @@ def run_simple_automation(config_parser, config, settings):
             vision_model=vision_model,
             stop_event=automation_state['stop_event'],
             run_dir=run_dir,
-            annotator=annotator
+            annotator=annotator,
+            config=config
         )
         
         success = simple_auto.run()
@@ -447,7 +448,7 @@ def run_state_machine_automation(config_parser, config, settings):
         
         # Initialize components
         network = NetworkManager(settings['sut_ip'], int(settings['sut_port']))
-        screenshot_mgr = ScreenshotManager(network)
+        screenshot_mgr = ScreenshotManager(network, image_format=config.get("metadata", {}).get("screenshot_format", "png"))
         
         # Initialize vision model
         if settings['vision_model'] == 'gemma':
@@ -495,16 +496,17 @@ def run_state_machine_automation(config_parser, config, settings):
             logger.info(f"Iteration {iteration}: Current state: {current_state}")
             
             # Capture screenshot
-            screenshot_path = f"{run_dir}/screenshots/screenshot_{iteration}.png"
-            screenshot_mgr.capture(screenshot_path)
+            screenshot_path = f"{run_dir}/screenshots/screenshot_{iteration}{screenshot_mgr.file_extension}"
+            screenshot_data = screenshot_mgr.capture_bytes()
+            screenshot_mgr.save(screenshot_path, screenshot_data)
             
-            # Process with vision model
-            bounding_boxes = vision_model.detect_ui_elements(screenshot_path)
+            # Process with vision model, reusing the captured bytes instead of re-reading the file
+            bounding_boxes = vision_model.detect_ui_elements(screenshot_path, image_data=screenshot_data)
             logger.info(f"Detected {len(bounding_boxes)} UI elements")
             
             # Annotate screenshot
             annotated_path = f"{run_dir}/annotated/annotated_{iteration}.png"
-            annotator.draw_bounding_boxes(screenshot_path, bounding_boxes, annotated_path)
+            annotator.draw_bounding_boxes(screenshot_path, bounding_boxes, annotated_path, image_data=screenshot_data)
             
             # Determine next action
             previous_state = current_state
@@ -456,7 +456,7 @@ def _run_simple_automation(config_parser, config, settings):
         network = NetworkManager(settings['sut_ip'], int(settings['sut_port']))
         
         logger.info("Initializing components...")
-        screenshot_mgr = ScreenshotManager(network)
+        screenshot_mgr = ScreenshotManager(network, image_format=config.get("metadata", {}).get("screenshot_format", "png"))
         
         # Initialize the vision model based on user selection
         if settings.get('vision_model') == 'gemma':
@@ -490,9 +490,8 @@ def _run_simple_automation(config_parser, config, settings):
                 logger.info(f"Waiting {startup_wait} seconds for game to fully initialize...")
                 wait_time = startup_wait
                 for i in range(wait_time):
-                    if automation_state['stop_event'].is_set():
+                    if automation_state['stop_event'].wait(1):
                         break
-                    time.sleep(1)
                     if i % 5 == 0:
                         socketio.emit('status_update', {
                             'status': f'Initializing ({wait_time-i}s)', 
@@ -518,7 +517,8 @@ def _run_simple_automation(config_parser, config, settings):
                 vision_model=vision_model,
                 stop_event=automation_state['stop_event'],
                 run_dir=run_dir,
-                annotator=annotator
+                annotator=annotator,
+                config=config
             )
             
             # Run the simple automation
@@ -589,7 +589,7 @@ def _run_state_machine_automation(config_parser, config, settings):
         network = NetworkManager(settings['sut_ip'], int(settings['sut_port']))
         
         logger.info("Initializing components...")
-        screenshot_mgr = ScreenshotManager(network)
+        screenshot_mgr = ScreenshotManager(network, image_format=config.get("metadata", {}).get("screenshot_format", "png"))
         
         # Initialize the vision model based on user selection
         if settings.get('vision_model') == 'gemma':
@@ -624,9 +624,8 @@ def _run_state_machine_automation(config_parser, config, settings):
                 logger.info(f"Waiting {startup_wait} seconds for game to fully initialize...")
                 wait_time = startup_wait
                 for i in range(wait_time):
-                    if automation_state['stop_event'].is_set():
+                    if automation_state['stop_event'].wait(1):
                         break
-                    time.sleep(1)
                     if i % 5 == 0:
                         socketio.emit('status_update', {
                             'status': f'Initializing ({wait_time-i}s)', 
@@ -680,17 +679,18 @@ def _run_state_machine_automation(config_parser, config, settings):
                     continue
                 
                 # Capture screenshot
-                screenshot_path = f"{run_dir}/screenshots/screenshot_{iteration}.png"
-                screenshot_mgr.capture(screenshot_path)
+                screenshot_path = f"{run_dir}/screenshots/screenshot_{iteration}{screenshot_mgr.file_extension}"
+                screenshot_data = screenshot_mgr.capture_bytes()
+                screenshot_mgr.save(screenshot_path, screenshot_data)
                 logger.info(f"Screenshot captured: {screenshot_path}")
                 
-                # Process with vision model
-                bounding_boxes = vision_model.detect_ui_elements(screenshot_path)
+                # Process with vision model, reusing the captured bytes instead of re-reading the file
+                bounding_boxes = vision_model.detect_ui_elements(screenshot_path, image_data=screenshot_data)
                 logger.info(f"Detected {len(bounding_boxes)} UI elements")
                 
                 # Annotate screenshot
                 annotated_path = f"{run_dir}/annotated/annotated_{iteration}.png"
-                annotator.draw_bounding_boxes(screenshot_path, bounding_boxes, annotated_path)
+                annotator.draw_bounding_boxes(screenshot_path, bounding_boxes, annotated_path, image_data=screenshot_data)
                 logger.info(f"Annotated screenshot saved: {annotated_path}")
                 
                 # Determine next action